@@ -19,4 +19,5 @@ urlpatterns = [
     
     # Analytics
     path('analytics', views.get_analytics, name='get_analytics'),
+    path('ml-stats', views.ml_stats, name='ml_stats'),  # Handles GET, DELETE
 ]
@@ -7,7 +7,9 @@ from django.db.models import Sum
 from apps.plans.models import Plan
 from apps.users.serializers import UserSerializer, AdminUserUpdateSerializer
 from apps.plans.serializers import PlanSerializer, PlanCreateSerializer, PlanUpdateSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from services.ml_service import get_ml_client_stats, get_prediction_cache_stats, clear_prediction_cache
+from services.password_service import PasswordHasherBusy, PASSWORD_HASH_WAIT
+from services.token_service import issue_tokens, revoke_refresh_token
 import logging
 
 User = get_user_model()
@@ -56,18 +58,18 @@ def admin_login(request):
             )
         
         # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        tokens = issue_tokens(user)
         
         # Set refresh token as cookie
         response = Response({
             'message': 'Admin login successful',
-            'accessToken': str(refresh.access_token),
+            'accessToken': tokens['access'],
             'user': UserSerializer(user).data
         })
         
         response.set_cookie(
             key='refreshToken',
-            value=str(refresh),
+            value=tokens['refresh'],
             httponly=True,
             secure=not request.META.get('HTTP_HOST', '').startswith('localhost'),
             samesite='Strict',
@@ -76,6 +78,13 @@ def admin_login(request):
         
         return response
     
+    except PasswordHasherBusy as e:
+        logger.warning('Admin login rejected: password hashing pool saturated')
+        return Response(
+            {'message': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(PASSWORD_HASH_WAIT)}
+        )
     except Exception as e:
         logger.error(f'Admin login error: {str(e)}')
         return Response(
@@ -97,6 +106,10 @@ def admin_logout(request):
         )
     
     try:
+        refresh = request.COOKIES.get('refreshToken')
+        if refresh:
+            revoke_refresh_token(refresh)
+        
         response = Response({'message': 'Admin logged out successfully'})
         response.delete_cookie('refreshToken')
         return response
@@ -479,13 +492,16 @@ def update_user_plan(request, id):
         
         # Update user's plan
         user.plan = plan
+        update_fields = ['plan', 'updated_at']
         
         # Reset usage if requested
         if reset_usage:
             user.jd_used = 0
             user.cv_used = 0
+            update_fields += ['jd_used', 'cv_used']
         
-        user.save()
+        # Leave the counters alone otherwise so concurrent uploads aren't overwritten
+        user.save(update_fields=update_fields)
         
         return Response({
             'message': 'User plan updated successfully',
@@ -570,3 +586,45 @@ def get_analytics(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def ml_stats(request):
+    """
+    GET: ML client connection pool and prediction cache statistics.
+    DELETE: Invalidate the prediction cache. Without ML_PREDICTION_CACHE_URL the
+    cache is per process, so only the worker serving the request is cleared.
+    """
+    if not is_admin(request.user):
+        return Response(
+            {'message': 'Admin access required.'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        if request.method == 'DELETE':
+            if clear_prediction_cache():
+                return Response({
+                    'message': 'Prediction cache cleared',
+                    'scope': 'shared'
+                })
+            return Response({
+                'message': 'Prediction cache cleared in this worker process only; '
+                           'set ML_PREDICTION_CACHE_URL to share it across workers',
+                'scope': 'process'
+            })
+        
+        return Response({
+            'message': 'ML statistics retrieved successfully',
+            'stats': {
+                'connectionPool': get_ml_client_stats(),
+                'predictionCache': get_prediction_cache_stats()
+            }
+        })
+    
+    except Exception as e:
+        logger.error(f'ML stats error: {str(e)}')
+        return Response(
+            {'message': 'Server error during ML statistics retrieval'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
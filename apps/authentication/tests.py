@@ -0,0 +1,48 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.plans.models import Plan
+from apps.users.models import User
+from services.token_service import issue_tokens
+
+
+class RefreshTokenViewTests(TestCase):
+    """POST /api/auth/refresh cookie handling."""
+
+    def setUp(self):
+        plan = Plan.objects.create(name='Freemium', region='Global', jd_limit=5, cv_limit=50)
+        self.user = User.objects.create_user(email='user@example.com', password='secret1', name='User', plan=plan)
+        self.client = APIClient()
+
+    def refresh(self, token):
+        self.client.cookies['refreshToken'] = token
+        return self.client.post('/api/auth/refresh')
+
+    def test_rotation_sets_new_cookie(self):
+        old = issue_tokens(self.user)['refresh']
+
+        response = self.refresh(old)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.cookies['refreshToken'].value, old)
+
+    def test_reuse_within_grace_window_keeps_cookie(self):
+        old = issue_tokens(self.user)['refresh']
+        rotated = self.refresh(old).cookies['refreshToken'].value
+
+        # The losing tab of a parallel refresh still sends the old cookie
+        response = self.refresh(old)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('refreshToken', response.cookies)
+        self.assertFalse(response.has_header('Set-Cookie'))
+        self.assertEqual(self.refresh(rotated).status_code, 200)
+
+    def test_unknown_token_clears_cookie(self):
+        other = User.objects.create_user(email='other@example.com', password='secret1', name='Other')
+        token = issue_tokens(other)['refresh']
+        other.refresh_tokens.all().delete()
+
+        response = self.refresh(token)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.cookies['refreshToken'].value, '')
@@ -6,13 +6,15 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from apps.plans.models import Plan
 from apps.users.serializers import UserSerializer
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from services.password_service import PasswordHasherBusy, PASSWORD_HASH_WAIT
+from services.google_auth_service import verify_google_id_token
+from services.token_service import (
+    issue_tokens, rotate_refresh_token, revoke_refresh_token, RefreshTokenInvalid, RefreshTokenRecentlyRotated
+)
 import logging
 
 User = get_user_model()
@@ -20,12 +22,8 @@ logger = logging.getLogger(__name__)
 
 
 def get_tokens_for_user(user):
-    """Generate JWT tokens for user."""
-    refresh = RefreshToken.for_user(user)
-    return {
-        'refresh': str(refresh),
-        'access': str(refresh.access_token),
-    }
+    """Generate JWT tokens for user (the refresh token is recorded server-side)."""
+    return issue_tokens(user)
 
 
 @api_view(['GET'])
@@ -113,6 +111,13 @@ def signup(request):
         
         return response
         
+    except PasswordHasherBusy as e:
+        logger.warning('Signup rejected: password hashing pool saturated')
+        return Response(
+            {'message': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(PASSWORD_HASH_WAIT)}
+        )
     except Exception as e:
         logger.error(f"Signup error: {str(e)}", exc_info=True)
         return Response(
@@ -173,6 +178,13 @@ def login(request):
         
         return response
         
+    except PasswordHasherBusy as e:
+        logger.warning('Login rejected: password hashing pool saturated')
+        return Response(
+            {'message': str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': str(PASSWORD_HASH_WAIT)}
+        )
     except Exception as e:
         logger.error(f"Login error: {str(e)}", exc_info=True)
         return Response(
@@ -199,14 +211,7 @@ def google_auth(request):
         
         # Verify Google token
         try:
-            idinfo = id_token.verify_oauth2_token(
-                token,
-                google_requests.Request(),
-                settings.GOOGLE_CLIENT_ID
-            )
-            
-            if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-                raise ValueError('Wrong issuer.')
+            idinfo = verify_google_id_token(token, settings.GOOGLE_CLIENT_ID)
             
             google_id = idinfo['sub']
             email = idinfo['email']
@@ -279,7 +284,11 @@ def google_auth(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout(request):
-    """Logout user."""
+    """Logout user and revoke their refresh token."""
+    refresh = request.COOKIES.get('refreshToken')
+    if refresh:
+        revoke_refresh_token(refresh)
+    
     response = Response({'message': 'Logged out successfully'})
     response.delete_cookie('refreshToken')
     return response
@@ -288,7 +297,7 @@ def logout(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def refresh_token(request):
-    """Refresh access token."""
+    """Refresh access token, rotating the refresh token cookie."""
     try:
         refresh = request.COOKIES.get('refreshToken')
         
@@ -298,13 +307,51 @@ def refresh_token(request):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        token = RefreshToken(refresh)
+        user, tokens = rotate_refresh_token(refresh)
         
-        return Response({
+        response = Response({
             'message': 'Token refreshed successfully',
-            'accessToken': str(token.access_token)
+            'accessToken': tokens['access']
         })
         
+        # Same cookie attributes as the login that issued the session
+        if user.role == 'admin':
+            response.set_cookie(
+                key='refreshToken',
+                value=tokens['refresh'],
+                httponly=True,
+                secure=not request.META.get('HTTP_HOST', '').startswith('localhost'),
+                samesite='Strict',
+                max_age=7 * 24 * 60 * 60
+            )
+        else:
+            response.set_cookie(
+                key='refreshToken',
+                value=tokens['refresh'],
+                httponly=True,
+                secure=False,
+                samesite='Lax',
+                max_age=7 * 24 * 60 * 60
+            )
+        
+        return response
+        
+    except RefreshTokenRecentlyRotated as e:
+        # A parallel refresh (another tab, a retry) won the rotation and has set
+        # the new cookie; deleting it here would log the user out
+        logger.info(f"Token refresh rejected: {str(e)}")
+        return Response(
+            {'message': 'Refresh token already rotated'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    except RefreshTokenInvalid as e:
+        logger.info(f"Token refresh rejected: {str(e)}")
+        response = Response(
+            {'message': 'Invalid refresh token'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+        response.delete_cookie('refreshToken')
+        return response
     except Exception as e:
         logger.error(f"Token refresh error: {str(e)}")
         return Response(
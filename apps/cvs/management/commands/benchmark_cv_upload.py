@@ -0,0 +1,85 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+import time
+import uuid
+
+from apps.cvs.models import CV
+from apps.users.models import User
+from apps.cvs.management.commands.benchmark_pdf_extraction import build_synthetic_pdf
+from services import pdf_service
+from services.cv_service import store_uploaded_cvs, server_timing
+from services.hashing import file_digest, text_digest
+
+
+class Command(BaseCommand):
+    help = 'Benchmark storing a multi-file CV upload: per-row INSERTs vs. the bulk_create pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=100, help='Number of CVs in the upload')
+        parser.add_argument('--pdf', action='store_true', help='Upload synthetic PDFs instead of text files')
+
+    def build_files(self, count, pdf):
+        files = []
+        for i in range(count):
+            # Unique content so nothing is deduplicated (same length keeps the PDF xref valid)
+            if pdf:
+                data = build_synthetic_pdf(1).replace(b'Page 1 line 1', b'CV %010d' % i, 1)
+                files.append(SimpleUploadedFile(f'cv_{i}.pdf', data, content_type='application/pdf'))
+            else:
+                data = f'CV {i} {uuid.uuid4().hex}\nPython Django REST experience, SQL, AWS.\n'.encode('utf-8') * 40
+                files.append(SimpleUploadedFile(f'cv_{i}.txt', data, content_type='text/plain'))
+        return files
+
+    def per_row(self, user, files, pdf):
+        """The old pipeline: one CV.objects.create (INSERT + commit) per file."""
+        start = time.perf_counter()
+        if pdf:
+            results = pdf_service.extract_texts_from_pdfs([pdf_service.pdf_source(file) for file in files])
+            texts = [result['text'] for result in results]
+        else:
+            texts = [file.read().decode('utf-8') for file in files]
+        file_hashes = [file_digest(file) for file in files]
+        extracted = time.perf_counter()
+
+        for file, file_hash, text in zip(files, file_hashes, texts):
+            CV.objects.create(
+                user=user,
+                filename=file.name,
+                content=text,
+                file_size=file.size,
+                file_hash=file_hash,
+                content_hash=text_digest(text),
+                status='active'
+            )
+        finished = time.perf_counter()
+        return {'extract': (extracted - start) * 1000, 'insert': (finished - extracted) * 1000}
+
+    def handle(self, *args, **options):
+        count = options['files']
+        pdf_service.PDF_TEXT_CACHE_ENABLED = False
+
+        runs = [
+            ('per-row create', lambda user, files: self.per_row(user, files, options['pdf'])),
+            ('bulk_create', None),
+        ]
+
+        self.stdout.write(f'{count} {"PDF" if options["pdf"] else "text"} CV(s) per upload\n')
+        for label, run in runs:
+            user = User.objects.create(
+                email=f'upload-bench-{uuid.uuid4().hex[:12]}@example.com',
+                name='Upload benchmark'
+            )
+            files = self.build_files(count, options['pdf'])
+            try:
+                start = time.perf_counter()
+                if run is None:
+                    timings = {}
+                    store_uploaded_cvs(user, files, timings=timings)
+                else:
+                    timings = run(user, files)
+                total = (time.perf_counter() - start) * 1000
+                stored = CV.objects.filter(user=user).count()
+            finally:
+                user.delete()
+
+            self.stdout.write(f'{label:>15}: {total:8.1f} ms total, {stored} rows  [{server_timing(timings)}]')
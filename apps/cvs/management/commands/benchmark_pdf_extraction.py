@@ -0,0 +1,127 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import time
+import tracemalloc
+
+import PyPDF2
+from io import BytesIO
+
+from services import pdf_service
+
+
+def build_synthetic_pdf(pages, lines_per_page=40):
+    """Build a plain multi-page text PDF without any extra dependencies."""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # Pages, filled in once the page object numbers are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    page_refs = []
+
+    for page in range(pages):
+        text = ['BT /F1 10 Tf 40 800 Td 12 TL']
+        for line in range(lines_per_page):
+            text.append(f'(Page {page + 1} line {line + 1}: Python Django REST experience, SQL, AWS.) Tj T*')
+        text.append('ET')
+        stream = '\n'.join(text).encode('latin-1')
+
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = b' '.join(b'%d 0 R' % ref for ref in page_refs)
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(page_refs))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+
+    xref_at = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_at)
+    return bytes(out)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF text extraction on synthetic PDFs: throughput (serial vs. process pool) or peak memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=24, help='Number of PDFs in the batch')
+        parser.add_argument('--pages', type=int, default=5, help='Pages per PDF')
+        parser.add_argument('--workers', default='', help='Comma-separated worker counts (default 1..cpu_count)')
+        parser.add_argument('--memory', action='store_true', help='Measure peak memory on one long PDF instead (use --pages 250)')
+
+    def measure(self, label, func):
+        tracemalloc.start()
+        start = time.perf_counter()
+        text = func()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(f'{label:>22}: {elapsed:6.2f}s  peak {peak / 1024 / 1024:7.2f} MB  {len(text):>9} chars')
+
+    def handle_memory(self, pages):
+        pdf = build_synthetic_pdf(pages)
+        self.stdout.write(f'1 PDF x {pages} pages ({len(pdf) / 1024:.0f} KB)\n')
+
+        def concatenate():
+            text = ''
+            for page in PyPDF2.PdfReader(BytesIO(pdf)).pages:
+                text += page.extract_text()
+            return text.strip()
+
+        self.measure('string concatenation', concatenate)
+        self.measure('join, no budget', lambda: pdf_service.extract_text_from_pdf(pdf, max_pages=0, max_chars=0))
+        self.measure('join, default budget', lambda: pdf_service.extract_text_from_pdf(pdf))
+
+    def handle(self, *args, **options):
+        # Measure parsing, not the extraction cache
+        pdf_service.PDF_TEXT_CACHE_ENABLED = False
+
+        if options['memory']:
+            return self.handle_memory(options['pages'])
+
+        cpus = os.cpu_count() or 1
+        levels = [int(w) for w in options['workers'].split(',')] if options['workers'] else sorted({1, 2, cpus // 2 or 1, cpus})
+        corpus = [build_synthetic_pdf(options['pages']) for _ in range(options['files'])]
+
+        self.stdout.write(f'{len(corpus)} PDFs x {options["pages"]} pages, {cpus} CPU(s)\n')
+
+        start = time.perf_counter()
+        for pdf in corpus:
+            pdf_service.extract_text_from_pdf(pdf)
+        serial = time.perf_counter() - start
+        self.stdout.write(f'{"serial":>10}: {serial:6.2f}s  {len(corpus) / serial:7.1f} files/s')
+
+        for workers in levels:
+            # Fresh pool per level, warmed up so process start-up isn't counted
+            pdf_service._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=pdf_service._init_extract_worker,
+                initargs=(pdf_service.PDF_EXTRACT_MEMORY_LIMIT_MB,)
+            )
+            pdf_service.PDF_EXTRACT_WORKERS = max(workers, 2)
+            pdf_service.extract_texts_from_pdfs(corpus[:workers * 2])
+
+            start = time.perf_counter()
+            results = pdf_service.extract_texts_from_pdfs(corpus)
+            elapsed = time.perf_counter() - start
+
+            failed = sum(1 for r in results if r['error'])
+            self.stdout.write(
+                f'{"pool=" + str(workers):>10}: {elapsed:6.2f}s  {len(corpus) / elapsed:7.1f} files/s'
+                + (f'  ({failed} failed)' if failed else '')
+            )
+            pdf_service._pool.shutdown()
+            pdf_service._pool = None
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the normalized extracted text', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='cv',
+            name='file_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the uploaded file bytes', max_length=64, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['user', 'file_hash'], name='cvs_user_id_3a57df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['user', 'content_hash'], name='cvs_user_id_82bcee_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:20
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def backfill_content_hash(apps, schema_editor):
+    # CVs uploaded before 0003 have no content_hash, so dedup could never match them.
+    # Uses the same digest as uploads so old and new CVs compare equal.
+    from services.hashing import text_digest
+
+    CV = apps.get_model('cvs', 'CV')
+    pending = CV.objects.filter(content_hash__isnull=True).order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id).only('id', 'content')[:BATCH_SIZE])
+        if not batch:
+            break
+        for cv in batch:
+            cv.content_hash = text_digest(cv.content)
+        CV.objects.bulk_update(batch, ['content_hash'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0003_cv_hashes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -15,6 +15,8 @@ class CV(models.Model):
     content = models.TextField(help_text="Extracted text content from PDF")
     file_path = models.CharField(max_length=500, null=True, blank=True)
     file_size = models.IntegerField(null=True, blank=True, help_text="File size in bytes")
+    file_hash = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the uploaded file bytes")
+    content_hash = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the normalized extracted text")
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     
@@ -27,6 +29,8 @@ class CV(models.Model):
         indexes = [
             models.Index(fields=['user', 'status']),
             models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'file_hash']),
+            models.Index(fields=['user', 'content_hash']),
         ]
     
     def __str__(self):
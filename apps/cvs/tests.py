@@ -0,0 +1,46 @@
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.cvs.management.commands.benchmark_pdf_extraction import build_synthetic_pdf
+from apps.cvs.models import CV
+from apps.plans.models import Plan
+from apps.users.models import User
+
+
+def cv_pdf(i):
+    data = build_synthetic_pdf(1).replace(b'Page 1 line 1', b'CV %010d' % i, 1)
+    return SimpleUploadedFile(f'cv_{i}.pdf', data, content_type='application/pdf')
+
+
+@mock.patch('services.pdf_service.PDF_TEXT_CACHE_ENABLED', False)
+@mock.patch('services.pdf_service.PDF_EXTRACT_WORKERS', 1)
+class CVUploadLimitTests(TestCase):
+    """POST /api/cv/upload against the plan's CV limit."""
+
+    def setUp(self):
+        plan = Plan.objects.create(name='Freemium', region='Global', jd_limit=5, cv_limit=2)
+        self.user = User.objects.create_user(email='user@example.com', password='secret1', name='User', plan=plan)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, *numbers):
+        return self.client.post('/api/cv/upload', {'cvFiles': [cv_pdf(i) for i in numbers]}, format='multipart')
+
+    def test_reupload_at_limit_is_allowed(self):
+        self.assertEqual(self.upload(1, 2).status_code, 201)
+
+        # Both files are already active CVs, so they cost no credits
+        response = self.upload(1, 2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['duplicates'], 2)
+        self.assertEqual(CV.objects.filter(user=self.user, status='active').count(), 2)
+
+    def test_new_file_over_limit_is_refused(self):
+        self.assertEqual(self.upload(1, 2).status_code, 201)
+
+        response = self.upload(1, 3)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['attempting'], 1)
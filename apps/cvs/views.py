@@ -5,8 +5,11 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from .models import CV
 from .serializers import CVSerializer, CVListSerializer
-from services.pdf_service import extract_text_from_pdf, validate_pdf
+from services.pdf_service import validate_pdf
+from services.cv_service import store_uploaded_cvs, server_timing
+from services.pagination import paginate_keyset, requested_fields
 from middleware.usage_limits import check_cv_limit, update_usage_stats
+from services.quota_service import adjust_active_count
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,45 +26,26 @@ def upload_cvs(request):
     try:
         files = request.FILES.getlist('cvFiles')
         
+        # Files the upload handler refused while streaming never reach request.FILES
+        errors = [
+            {'filename': r['filename'], 'error': r['error']}
+            for r in getattr(request, 'rejected_uploads', [])
+        ]
+        
         if not files:
             return Response(
-                {'message': 'Please upload at least one PDF file'},
+                {'message': errors[0]['error'] if errors else 'Please upload at least one PDF file'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         uploaded_cvs = []
-        errors = []
         
-        # Process each PDF
+        # Validate every PDF first
+        valid_files = []
         for file in files:
             try:
-                # Validate PDF
                 validate_pdf(file)
-                
-                # Extract text from PDF
-                logger.info(f'📄 Extracting text from CV: {file.name}')
-                content = extract_text_from_pdf(file.read())
-                logger.info(f'✅ CV text extracted! Length: {len(content)} chars')
-                logger.info(f'📝 First 150 chars: {content[:150]}...')
-                
-                # Create CV record
-                cv = CV.objects.create(
-                    user=request.user,
-                    filename=file.name,
-                    content=content,
-                    file_size=file.size
-                )
-                
-                uploaded_cvs.append({
-                    '_id': cv.id,
-                    'filename': cv.filename,
-                    'createdAt': cv.created_at.isoformat()
-                })
-                logger.info(f'💾 CV saved to database: {cv.filename}')
-                
-                # Update usage stats
-                update_usage_stats(request.user, 'cv')
-            
+                valid_files.append(file)
             except Exception as e:
                 logger.error(f'Error processing {file.name}: {str(e)}')
                 errors.append({
@@ -69,16 +53,49 @@ def upload_cvs(request):
                     'error': str(e)
                 })
         
+        # Extract text in parallel and save, reusing CVs already uploaded
+        logger.info(f'📄 Processing {len(valid_files)} CV(s)')
+        duplicates = 0
+        timings = {}
+        
+        for stored in store_uploaded_cvs(request.user, valid_files, timings=timings):
+            file = stored['file']
+            if stored['error']:
+                errors.append({
+                    'filename': file.name,
+                    'error': stored['error']
+                })
+                continue
+            
+            cv = stored['cv']
+            uploaded_cvs.append({
+                '_id': cv.id,
+                'filename': cv.filename,
+                'duplicate': stored['duplicate'],
+                'createdAt': cv.created_at.isoformat()
+            })
+            
+            if stored['duplicate']:
+                duplicates += 1
+        
+        # Update usage stats once for the whole upload
+        update_usage_stats(request.user, 'cv', len(uploaded_cvs) - duplicates)
+        
         response_data = {
             'success': True,
             'message': f'{len(uploaded_cvs)} CV(s) uploaded successfully',
+            'duplicates': duplicates,
             'data': uploaded_cvs
         }
         
         if errors:
             response_data['errors'] = errors
         
-        return Response(response_data, status=status.HTTP_201_CREATED)
+        logger.info(f'⏱️ CV upload timings ({len(valid_files)} files): {server_timing(timings)}')
+        
+        response = Response(response_data, status=status.HTTP_201_CREATED)
+        response['Server-Timing'] = server_timing(timings)
+        return response
     
     except Exception as e:
         logger.error(f'CV upload error: {str(e)}')
@@ -92,30 +109,51 @@ def upload_cvs(request):
 @permission_classes([IsAuthenticated])
 def get_all_cvs(request):
     """
-    Get all user's CVs.
+    Get user's CVs, newest first, one page at a time.
+    Query params: limit, cursor (from nextCursor), include=content to also return CV text.
     """
     try:
+        include_content = 'content' in requested_fields(request)
+        
         cvs = CV.objects.filter(
             user=request.user,
             status='active'
-        ).order_by('-created_at')
+        )
+        
+        # Only read CV bodies from the database when they were asked for
+        list_fields = [f for f in CVListSerializer.Meta.fields if hasattr(CV, f)]
+        if include_content:
+            list_fields.append('content')
+        cvs = cvs.only(*list_fields)
         
-        serializer = CVSerializer(cvs, many=True)
+        try:
+            page, next_cursor = paginate_keyset(cvs, request)
+        except ValueError as e:
+            return Response(
+                {'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = CVListSerializer(page, many=True)
+        data = []
+        for cv, item in zip(page, serializer.data):
+            entry = {
+                '_id': item['id'],
+                'filename': item['filename'],
+                'fileSize': item.get('file_size'),
+                'status': item['status'],
+                'createdAt': item['created_at']
+            }
+            if include_content:
+                entry['content'] = cv.content
+            data.append(entry)
         
         return Response({
             'success': True,
-            'count': len(serializer.data),
-            'data': [
-                {
-                    '_id': cv['id'],
-                    'filename': cv['filename'],
-                    'content': cv['content'],
-                    'fileSize': cv.get('file_size'),
-                    'status': cv['status'],
-                    'createdAt': cv['created_at']
-                }
-                for cv in serializer.data
-            ]
+            'count': len(data),
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None,
+            'data': data
         })
     
     except Exception as e:
@@ -164,9 +202,13 @@ def delete_cv(request, id):
         cv = CV.objects.get(id=id, user=request.user)
         
         # Soft delete (archive)
+        was_active = cv.status == 'active'
         cv.status = 'archived'
         cv.save()
         
+        if was_active:
+            adjust_active_count(request.user.id, 'cv', -1)
+        
         return Response({
             'success': True,
             'message': 'CV deleted successfully'
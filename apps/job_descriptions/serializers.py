@@ -37,3 +37,17 @@ class JobDescriptionListSerializer(serializers.ModelSerializer):
         model = JobDescription
         fields = ['id', 'title', 'description', 'filename', 'status', 
                   'ranked_cvs_count', 'rankedCvsCount', 'created_at', 'createdAt']
+
+
+class JobDescriptionSummarySerializer(JobDescriptionSerializer):
+    """JobDescriptionSerializer without content, for listings that leave the text out."""
+    
+    class Meta(JobDescriptionSerializer.Meta):
+        fields = [f for f in JobDescriptionSerializer.Meta.fields if f != 'content']
+
+
+# Model columns needed by JobDescriptionListSerializer, so list queries never load content
+JD_LIST_FIELDS = [f for f in JobDescriptionListSerializer.Meta.fields if hasattr(JobDescription, f)]
+
+# Same for JobDescriptionSummarySerializer
+JD_SUMMARY_FIELDS = [f for f in JobDescriptionSummarySerializer.Meta.fields if hasattr(JobDescription, f)]
@@ -7,10 +7,13 @@ from .models import JobDescription
 from .serializers import (
     JobDescriptionSerializer,
     JobDescriptionCreateSerializer,
-    JobDescriptionListSerializer
+    JobDescriptionListSerializer,
+    JD_LIST_FIELDS
 )
-from services.pdf_service import extract_text_from_pdf, validate_pdf
+from services.pdf_service import extract_text_from_pdf, validate_pdf, pdf_source
+from services.pagination import paginate_keyset, count_first_page
 from middleware.usage_limits import check_jd_limit, update_usage_stats
+from services.quota_service import adjust_active_count
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,14 @@ def upload_jd(request):
         content = request.data.get('content')
         file = request.FILES.get('jdFile')
         
+        # A file the upload handler refused while streaming never reaches request.FILES
+        rejected = getattr(request, 'rejected_uploads', [])
+        if not file and rejected:
+            return Response(
+                {'message': rejected[0]['error']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         jd_content = ''
         
         # If file uploaded, extract text
@@ -37,7 +48,7 @@ def upload_jd(request):
             logger.info(f'📄 Extracting text from JD PDF: {file.name}')
             try:
                 validate_pdf(file)
-                jd_content = extract_text_from_pdf(file.read())
+                jd_content = extract_text_from_pdf(pdf_source(file))
                 logger.info(f'✅ JD Text extracted successfully!')
                 logger.info(f'📝 First 200 chars: {jd_content[:200]}')
                 logger.info(f'📊 Total length: {len(jd_content)} characters')
@@ -71,6 +82,7 @@ def upload_jd(request):
         
         # Update usage stats
         update_usage_stats(request.user, 'jd')
+        adjust_active_count(request.user.id, 'jd', 1)
         
         return Response({
             'success': True,
@@ -97,19 +109,31 @@ def upload_jd(request):
 @permission_classes([IsAuthenticated])
 def get_all_jds(request):
     """
-    Get all user's Job Descriptions.
+    Get user's Job Descriptions, newest first, one page at a time.
+    Query params: limit, cursor (from nextCursor).
     """
     try:
         jds = JobDescription.objects.filter(
             user=request.user,
             status='active'
-        ).order_by('-created_at')
+        ).only(*JD_LIST_FIELDS)
         
-        serializer = JobDescriptionListSerializer(jds, many=True)
+        try:
+            page, next_cursor = paginate_keyset(jds, request)
+        except ValueError as e:
+            return Response(
+                {'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = JobDescriptionListSerializer(page, many=True)
         
         return Response({
             'success': True,
             'count': len(serializer.data),
+            'total': count_first_page(jds, request),
+            'nextCursor': next_cursor,
+            'hasMore': next_cursor is not None,
             'data': [
                 {
                     '_id': jd['id'],
@@ -170,9 +194,13 @@ def delete_jd(request, id):
         jd = JobDescription.objects.get(id=id, user=request.user)
         
         # Soft delete (archive)
+        was_active = jd.status == 'active'
         jd.status = 'archived'
         jd.save()
         
+        if was_active:
+            adjust_active_count(request.user.id, 'jd', -1)
+        
         return Response({
             'success': True,
             'message': 'Job Description deleted successfully'
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+import time
+
+from apps.plans.models import Plan
+from apps.plans.serializers import PlanSerializer
+from apps.plans.urls import get_all_plans
+from services.plan_catalog_service import get_plan_catalog, invalidate_plan_catalog
+
+
+@api_view(['GET'])
+def uncached_plans(request):
+    """get_all_plans before the catalog cache: query and serialize on every hit."""
+    plans = Plan.objects.filter(is_active=True).order_by('region', 'sort_order', 'name')
+    serializer = PlanSerializer(plans, many=True)
+    return Response({
+        'success': True,
+        'plans': serializer.data
+    })
+
+
+class Command(BaseCommand):
+    help = 'Benchmark GET /api/plans/ requests per second: uncached vs. cached catalog vs. 304 revalidation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run')
+
+    def run(self, label, view, count, **headers):
+        factory = APIRequestFactory()
+
+        def request():
+            response = view(factory.get('/api/plans/', HTTP_ACCEPT='application/json', **headers))
+            # DRF responses render lazily; the cached catalog is already bytes
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        request()  # warm up
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            for _ in range(count):
+                response = request()
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'{label:>18}: {count / elapsed:9.0f} req/s, {elapsed / count * 1000:6.3f} ms/req, '
+            f'{len(queries) / count:.1f} queries/req, status {response.status_code}, {len(response.content)} bytes'
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        plans = Plan.objects.filter(is_active=True).count()
+        if not plans:
+            self.stdout.write(self.style.WARNING('⚠️ No active plans; run seed_plans first for realistic numbers'))
+
+        invalidate_plan_catalog()
+        etag = get_plan_catalog('all')['etag']
+
+        self.stdout.write(f'{plans} active plan(s), {count} requests per run\n')
+        self.run('uncached', uncached_plans, count)
+        self.run('cached catalog', get_all_plans, count)
+        self.run('If-None-Match 304', get_all_plans, count, HTTP_IF_NONE_MATCH=etag)
@@ -0,0 +1,19 @@
+"""
+Plan signals
+Keep cached plan data in step with the plans table
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Plan
+from services.quota_service import invalidate_plan_limits
+from services.user_cache import invalidate_plan
+from services.plan_catalog_service import invalidate_plan_catalog
+
+
+@receiver(post_save, sender=Plan)
+@receiver(post_delete, sender=Plan)
+def plan_changed(sender, instance, **kwargs):
+    """Drop the cached limits, plan row and plan catalogs after a plan is edited or deleted."""
+    invalidate_plan_limits(instance.id)
+    invalidate_plan(instance.id)
+    invalidate_plan_catalog()
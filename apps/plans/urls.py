@@ -1,18 +1,11 @@
 from django.urls import path
 from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from .models import Plan
-from .serializers import PlanSerializer
+from services.plan_catalog_service import plan_catalog_response
 
 @api_view(['GET'])
 def get_all_plans(request):
-    """Get all active plans - Public endpoint."""
-    plans = Plan.objects.filter(is_active=True).order_by('region', 'sort_order', 'name')
-    serializer = PlanSerializer(plans, many=True)
-    return Response({
-        'success': True,
-        'plans': serializer.data
-    })
+    """Get all active plans - Public endpoint (cached, supports If-None-Match)."""
+    return plan_catalog_response(request, 'all')
 
 urlpatterns = [
     path('', get_all_plans, name='get_plans'),
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.cvs.models import CV
+from apps.rankings.models import RankingResult, RankingEntry
+
+
+class Command(BaseCommand):
+    help = 'Create RankingEntry rows from the results JSON of existing rankings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rankings loaded per batch')
+        parser.add_argument('--rebuild', action='store_true', help='Also rebuild rankings that already have entries')
+
+    def handle(self, *args, **options):
+        rankings = RankingResult.objects.filter(status='completed').order_by('id')
+        if not options['rebuild']:
+            rankings = rankings.filter(entries__isnull=True)
+
+        processed = 0
+        created = 0
+        skipped = 0
+
+        for ranking in rankings.only('id', 'results').iterator(chunk_size=options['batch_size']):
+            results = [r for r in (ranking.results or []) if r.get('cv') is not None]
+            existing_cv_ids = set(
+                CV.objects.filter(id__in=[r['cv'] for r in results]).values_list('id', flat=True)
+            )
+            entries = [
+                RankingEntry.from_result(ranking, r)
+                for r in results
+                if r['cv'] in existing_cv_ids
+            ]
+
+            with transaction.atomic():
+                RankingEntry.objects.filter(ranking=ranking).delete()
+                RankingEntry.objects.bulk_create(entries)
+
+            processed += 1
+            created += len(entries)
+            skipped += len(results) - len(entries)
+
+        self.stdout.write(self.style.SUCCESS(f'\n📊 Summary:'))
+        self.stdout.write(f'   Rankings: {processed}')
+        self.stdout.write(f'   Entries created: {created}')
+        self.stdout.write(f'   Skipped (CV deleted): {skipped}')
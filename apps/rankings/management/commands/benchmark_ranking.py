@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+from services import ml_service
+
+
+class StubMLHandler(BaseHTTPRequestHandler):
+    """Fake ML API that sleeps for a fixed latency then returns a prediction."""
+
+    latency = 0.2
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        time.sleep(self.latency)
+
+        body = json.dumps({
+            'result': {
+                'prediction': 'Relevant' if len(payload.get('resume', '')) % 2 else 'Not Relevant',
+                'confidence': len(payload.get('resume', '')) % 100
+            }
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rank_multiple_cvs wall-clock time against a local stub ML server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,5,10,25,50', help='Comma-separated batch sizes')
+        parser.add_argument('--concurrency', default='1,4,8,16', help='Comma-separated concurrency levels')
+        parser.add_argument('--latency', type=float, default=0.2, help='Stub ML latency per request (seconds)')
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',')]
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        StubMLHandler.latency = options['latency']
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubMLHandler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        client = ml_service.MLClient(url=f'http://127.0.0.1:{server.server_address[1]}/api')
+
+        try:
+            self.stdout.write(f'Stub ML latency: {options["latency"]}s per CV\n')
+            self.stdout.write(f'{"batch":>6} ' + ' '.join(f'{"c=" + str(c):>9}' for c in levels))
+
+            for size in sizes:
+                cvs = [
+                    {'id': i, 'filename': f'cv_{i}.pdf', 'content': 'x' * (100 + i)}
+                    for i in range(size)
+                ]
+                timings = []
+                for level in levels:
+                    start = time.perf_counter()
+                    ml_service.rank_multiple_cvs('Benchmark job description', cvs, max_concurrency=level, client=client, use_cache=False)
+                    timings.append(time.perf_counter() - start)
+
+                self.stdout.write(f'{size:>6} ' + ' '.join(f'{t:>8.2f}s' for t in timings))
+
+            stats = client.stats()
+            self.stdout.write(f'\nConnection pool: {stats["requests"]} requests, {stats["hits"]} hits, {stats["misses"]} misses')
+        finally:
+            client.close()
+            server.shutdown()
+            server.server_close()
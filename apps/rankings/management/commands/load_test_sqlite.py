@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+
+from apps.cvs.models import CV
+from apps.job_descriptions.models import JobDescription
+from apps.rankings.models import RankingEntry, RankingResult
+from apps.users.models import User
+
+# Django's stock SQLite behaviour, for comparison with SQLITE_PRAGMAS
+STOCK_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 5000}
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test SQLite with ranking-style writers and list-view readers on a throwaway '
+        'database, comparing stock settings with SQLITE_PRAGMAS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+        parser.add_argument('--writers', type=int, default=2, help='Threads rewriting ranking results')
+        parser.add_argument('--readers', type=int, default=8, help='Threads listing CVs and top results')
+        parser.add_argument('--cvs', type=int, default=200, help='CVs per ranking')
+
+    def add_database(self, alias, path, pragmas):
+        config = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': path,
+            'OPTIONS': {'timeout': pragmas.get('busy_timeout', 5000) / 1000},
+        }
+        # configure_settings fills in the defaults Django expects on every alias
+        connections.settings[alias] = connections.configure_settings({
+            'default': settings.DATABASES['default'],
+            alias: config
+        })[alias]
+
+    def seed(self, alias, writers, cv_count):
+        user = User.objects.db_manager(alias).create(email='load@example.com', name='Load test')
+        jd = JobDescription.objects.using(alias).create(
+            user=user, title='Load test', description='Load test', content='Python Django'
+        )
+        CV.objects.using(alias).bulk_create([
+            CV(user=user, filename=f'cv_{i}.pdf', content='Python Django ' * 50)
+            for i in range(cv_count)
+        ])
+        cv_ids = list(CV.objects.using(alias).filter(user=user).values_list('id', flat=True))
+        rankings = [
+            RankingResult.objects.using(alias).create(user=user, job_description=jd, cv_ids=cv_ids)
+            for _ in range(writers)
+        ]
+        return user.id, cv_ids, [ranking.id for ranking in rankings]
+
+    def run_profile(self, name, pragmas, options):
+        alias = f'loadtest_{name}'
+        directory = tempfile.mkdtemp(prefix='talentranker-load-')
+        self.add_database(alias, os.path.join(directory, 'load.sqlite3'), pragmas)
+
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            call_command('migrate', database=alias, verbosity=0)
+            user_id, cv_ids, ranking_ids = self.seed(alias, options['writers'], options['cvs'])
+
+            deadline = time.perf_counter() + options['seconds']
+            stats = {'writes': 0, 'write_errors': 0, 'read_errors': 0, 'latencies': []}
+            lock = threading.Lock()
+
+            def writer(ranking_id):
+                try:
+                    while time.perf_counter() < deadline:
+                        results = [
+                            {'cv': cv_id, 'prediction': 'Relevant', 'confidence': random.random() * 100}
+                            for cv_id in cv_ids
+                        ]
+                        try:
+                            # Same shape as complete_ranking: results JSON plus RankingEntry rows
+                            with transaction.atomic(using=alias):
+                                RankingResult.objects.using(alias).filter(id=ranking_id).update(
+                                    results=results, status='completed', updated_at=timezone.now()
+                                )
+                                RankingEntry.objects.using(alias).filter(ranking_id=ranking_id).delete()
+                                RankingEntry.objects.using(alias).bulk_create([
+                                    RankingEntry(
+                                        ranking_id=ranking_id, cv_id=r['cv'],
+                                        prediction=r['prediction'], confidence=r['confidence']
+                                    )
+                                    for r in results
+                                ])
+                            with lock:
+                                stats['writes'] += 1
+                        except OperationalError:
+                            with lock:
+                                stats['write_errors'] += 1
+                finally:
+                    connections[alias].close()
+
+            def reader():
+                try:
+                    while time.perf_counter() < deadline:
+                        start = time.perf_counter()
+                        try:
+                            list(
+                                CV.objects.using(alias).filter(user_id=user_id, status='active')
+                                .order_by('-created_at', '-id').only('id', 'filename')[:50]
+                            )
+                            list(
+                                RankingEntry.objects.using(alias).filter(ranking__user_id=user_id)
+                                .order_by('-confidence')[:10]
+                            )
+                        except OperationalError:
+                            with lock:
+                                stats['read_errors'] += 1
+                            continue
+                        with lock:
+                            stats['latencies'].append((time.perf_counter() - start) * 1000)
+                finally:
+                    connections[alias].close()
+
+            threads = [threading.Thread(target=writer, args=(ranking_id,)) for ranking_id in ranking_ids]
+            threads += [threading.Thread(target=reader) for _ in range(options['readers'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            with connections[alias].cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                journal_mode = cursor.fetchone()[0]
+            connections[alias].close()
+
+        shutil.rmtree(directory, ignore_errors=True)
+
+        latencies = sorted(stats['latencies']) or [0]
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+        self.stdout.write(
+            f'{name:>6} ({journal_mode:>6}): {stats["writes"] / options["seconds"]:7.1f} writes/s ({stats["write_errors"]} locked), '
+            f'{len(stats["latencies"]) / options["seconds"]:8.1f} reads/s ({stats["read_errors"]} locked), '
+            f'read p50 {statistics.median(latencies):6.2f} ms, p95 {p95:7.2f} ms, max {latencies[-1]:8.2f} ms'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'{options["writers"]} writer(s) x {options["cvs"]} CVs, {options["readers"]} reader(s), '
+            f'{options["seconds"]:.0f}s per run\n'
+        )
+        self.stdout.write(f' stock: {STOCK_PRAGMAS}')
+        self.stdout.write(f' tuned: {settings.SQLITE_PRAGMAS}\n')
+
+        self.run_profile('stock', STOCK_PRAGMAS, options)
+        self.run_profile('tuned', settings.SQLITE_PRAGMAS, options)
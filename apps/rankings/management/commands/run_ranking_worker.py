@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+import os
+import socket
+import time
+
+from services.ranking_service import claim_next_job, process_job
+
+
+class Command(BaseCommand):
+    help = 'Drain queued ranking jobs from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(self.style.SUCCESS(f'🚀 Ranking worker started: {worker_id}'))
+
+        processed = 0
+        try:
+            while True:
+                close_old_connections()
+                job = claim_next_job(worker_id)
+
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+
+                completed = process_job(job)
+                processed += 1
+                if completed:
+                    self.stdout.write(self.style.SUCCESS(f'✅ Job {job.id} completed'))
+                else:
+                    self.stdout.write(self.style.WARNING(f'🔄 Job {job.id} {job.status}: {job.last_error}'))
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(f'Processed {processed} job(s)')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rankings', '0003_rankingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankingresult',
+            name='cv_ids',
+            field=models.JSONField(blank=True, default=list, help_text='IDs of the CVs requested for this ranking'),
+        ),
+    ]
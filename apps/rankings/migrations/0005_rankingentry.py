@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cvs', '0002_initial'),
+        ('rankings', '0004_rankingresult_cv_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RankingEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prediction', models.CharField(max_length=50)),
+                ('confidence', models.FloatField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('cv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranking_entries', to='cvs.cv')),
+                ('ranking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='rankings.rankingresult')),
+            ],
+            options={
+                'db_table': 'ranking_entries',
+                'ordering': ['ranking', '-confidence'],
+                'indexes': [models.Index(fields=['ranking', '-confidence'], name='ranking_ent_ranking_15fef4_idx'), models.Index(fields=['cv'], name='ranking_ent_cv_id_3d892a_idx')],
+            },
+        ),
+    ]
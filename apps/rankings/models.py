@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class RankingResult(models.Model):
@@ -16,6 +17,7 @@ class RankingResult(models.Model):
     
     # Store results as JSON
     results = models.JSONField(default=list, help_text="Array of ranking results")
+    cv_ids = models.JSONField(default=list, blank=True, help_text="IDs of the CVs requested for this ranking")
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='processing')
     error = models.TextField(null=True, blank=True)
@@ -35,6 +37,41 @@ class RankingResult(models.Model):
         return f"Ranking for {self.job_description.title} - {self.status}"
 
 
+class RankingEntry(models.Model):
+    """One CV's result within a ranking, normalized out of RankingResult.results for querying."""
+    
+    ranking = models.ForeignKey(RankingResult, on_delete=models.CASCADE, related_name='entries')
+    cv = models.ForeignKey('cvs.CV', on_delete=models.CASCADE, related_name='ranking_entries')
+    
+    prediction = models.CharField(max_length=50)
+    confidence = models.FloatField(default=0)
+    error = models.TextField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ranking_entries'
+        ordering = ['ranking', '-confidence']
+        indexes = [
+            models.Index(fields=['ranking', '-confidence']),
+            models.Index(fields=['cv']),
+        ]
+    
+    def __str__(self):
+        return f"CV {self.cv_id} in ranking {self.ranking_id} - {self.prediction} ({self.confidence}%)"
+    
+    @classmethod
+    def from_result(cls, ranking, result):
+        """Build an unsaved entry from one item of RankingResult.results."""
+        return cls(
+            ranking=ranking,
+            cv_id=result['cv'],
+            prediction=result.get('prediction', 'Error'),
+            confidence=result.get('confidence') or 0,
+            error=result.get('error')
+        )
+
+
 class UpgradeRequest(models.Model):
     """Model to track plan upgrade requests."""
     
@@ -64,3 +101,38 @@ class UpgradeRequest(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.requested_plan.name} - {self.status}"
+
+
+class RankingJob(models.Model):
+    """Background ranking job, queued in the database and drained by run_ranking_worker."""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    ranking_result = models.OneToOneField(RankingResult, on_delete=models.CASCADE, related_name='job')
+    cv_ids = models.JSONField(default=list, help_text="IDs of the CVs to rank")
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Earliest time the job may be claimed")
+    locked_by = models.CharField(max_length=100, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'ranking_jobs'
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"Job for ranking {self.ranking_result_id} - {self.status}"
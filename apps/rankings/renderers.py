@@ -0,0 +1,18 @@
+from rest_framework.renderers import BaseRenderer
+import json
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients ask for text/event-stream (as EventSource does) without DRF
+    answering 406. The stream itself is a StreamingHttpResponse and never goes
+    through here; this only renders early errors as a single 'error' event.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return f'event: error\ndata: {json.dumps(data, default=str)}\n\n'.encode(self.charset)
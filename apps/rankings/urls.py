@@ -3,8 +3,12 @@ from . import views
 
 urlpatterns = [
     path('rank', views.rank_cvs, name='rank_cvs'),
+    path('rank-stream', views.rank_cvs_stream, name='rank_cvs_stream'),
     path('rank-with-files', views.rank_with_files, name='rank_with_files'),
     path('results', views.get_ranking_results, name='get_ranking_results'),
     path('results/<int:id>', views.get_ranking_result_by_id, name='get_ranking_result_by_id'),
+    path('top-cvs', views.get_top_cvs, name='get_top_cvs'),
+    path('cv/<int:cv_id>', views.get_cv_rankings, name='get_cv_rankings'),
+    path('results/<int:id>/resume', views.resume_ranking_result, name='resume_ranking_result'),
     path('results/<int:id>', views.delete_ranking_result, name='delete_ranking_result'),
 ]
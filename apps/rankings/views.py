@@ -1,24 +1,69 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from .models import RankingResult
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from .models import RankingResult, RankingEntry
 from .serializers import RankingResultSerializer, RankingRequestSerializer
+from .renderers import EventStreamRenderer
 from apps.job_descriptions.models import JobDescription
 from apps.cvs.models import CV
-from services.ml_service import rank_multiple_cvs
-from services.pdf_service import extract_text_from_pdf
+from services.ranking_service import (
+    run_ranking,
+    resume_ranking,
+    enqueue_ranking,
+    claim_ranking_for_resume,
+    RankingInProgress,
+    iter_ranking,
+    load_cv_data
+)
+from services.pdf_service import extract_text_from_pdf, pdf_source
+from services.cv_service import store_uploaded_cvs, server_timing
+from services.quota_service import (
+    adjust_active_count,
+    reserve_credits,
+    release_credits,
+    get_remaining_credits
+)
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def wants_async(request):
+    """Check if the client asked for a queued ranking job (?async=true or 'async' field)."""
+    value = request.query_params.get('async', request.data.get('async'))
+    if value is None:
+        return getattr(settings, 'RANKING_ASYNC_DEFAULT', False)
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def queued_response(ranking_result, jd):
+    """Response for a ranking that was handed to the background worker."""
+    return Response({
+        'success': True,
+        'message': 'Ranking queued',
+        'rankingResult': {
+            '_id': ranking_result.id,
+            'jdTitle': jd.title,
+            'status': ranking_result.status,
+            'results': [],
+            'createdAt': ranking_result.created_at.isoformat()
+        }
+    }, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def rank_cvs(request):
     """
     Rank CVs against a Job Description using ML model.
+    Pass async=true to queue the ranking and return immediately.
     """
     try:
         logger.info(f'📥 Received ranking request body: {request.data}')
@@ -79,25 +124,21 @@ def rank_cvs(request):
             user=request.user,
             job_description=jd,
             status='processing',
-            results=[]
+            results=[],
+            cv_ids=[cv['id'] for cv in cv_data]
         )
         
+        if wants_async(request):
+            enqueue_ranking(ranking_result, ranking_result.cv_ids)
+            return queued_response(ranking_result, jd)
+        
         # Rank CVs using ML model
         try:
             logger.info('🤖 Calling ML API to rank CVs...')
-            rankings = rank_multiple_cvs(jd.content, cv_data)
+            rankings = run_ranking(ranking_result, jd.content, cv_data)
             logger.info('✅ ML API ranking completed successfully!')
             logger.info(f'📈 Rankings: {rankings}')
             
-            # Update ranking result with results
-            ranking_result.results = rankings
-            ranking_result.status = 'completed'
-            ranking_result.save()
-            
-            # Update JD ranked CVs count
-            jd.ranked_cvs_count += len(cvs)
-            jd.save()
-            
             return Response({
                 'success': True,
                 'message': 'CVs ranked successfully',
@@ -126,6 +167,97 @@ def rank_cvs(request):
         )
 
 
+def sse_event(event, data):
+    """Format one Server-Sent Event."""
+    return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def rank_cvs_stream(request):
+    """
+    Rank CVs against a Job Description, streaming progress as Server-Sent Events.
+    Sends a 'result' event per CV as it is scored, then a 'complete' event
+    with the sorted results (or an 'error' event).
+    """
+    try:
+        serializer = RankingRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            jd = JobDescription.objects.get(
+                id=serializer.validated_data['jd_id'],
+                user=request.user,
+                status='active'
+            )
+        except JobDescription.DoesNotExist:
+            return Response(
+                {'message': 'Job Description not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        cv_data = load_cv_data(request.user.id, serializer.validated_data['cv_ids'])
+        if not cv_data:
+            return Response(
+                {'message': 'No valid CVs found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        ranking_result = RankingResult.objects.create(
+            user=request.user,
+            job_description=jd,
+            status='processing',
+            results=[],
+            cv_ids=[cv['id'] for cv in cv_data]
+        )
+        
+        logger.info(f'📡 Streaming ranking {ranking_result.id}: {len(cv_data)} CVs')
+    
+    except Exception as e:
+        logger.error(f'Streaming ranking error: {str(e)}')
+        return Response(
+            {'message': str(e) or 'Failed to rank CVs'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    def events():
+        total = len(cv_data)
+        yield sse_event('start', {'_id': ranking_result.id, 'jdTitle': jd.title, 'total': total})
+        
+        completed = 0
+        try:
+            for entry in iter_ranking(ranking_result, jd.content, cv_data):
+                completed += 1
+                yield sse_event('result', {'completed': completed, 'total': total, 'result': entry})
+            
+            yield sse_event('complete', {
+                '_id': ranking_result.id,
+                'jdTitle': jd.title,
+                'results': ranking_result.results,
+                'createdAt': ranking_result.created_at.isoformat()
+            })
+        except GeneratorExit:
+            # Client went away mid-batch
+            if ranking_result.status == 'processing':
+                ranking_result.status = 'failed'
+                ranking_result.error = 'Stream closed before ranking completed'
+                ranking_result.save()
+            raise
+        except Exception as e:
+            logger.error(f'❌ Streaming ranking error: {str(e)}')
+            ranking_result.status = 'failed'
+            ranking_result.error = str(e)
+            ranking_result.save()
+            yield sse_event('error', {'_id': ranking_result.id, 'message': str(e) or 'Failed to rank CVs'})
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering events
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_ranking_results(request):
@@ -188,6 +320,10 @@ def get_ranking_result_by_id(request, id):
                 'results': result.results,
                 'status': result.status,
                 'error': result.error,
+                'progress': {
+                    'completed': len(result.results),
+                    'total': len(result.cv_ids) or len(result.results)
+                },
                 'createdAt': result.created_at.isoformat()
             }
         })
@@ -205,6 +341,79 @@ def get_ranking_result_by_id(request, id):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def resume_ranking_result(request, id):
+    """
+    Resume an interrupted ranking, re-scoring only CVs without a stored result.
+    Pass async=true to queue the resume and return immediately.
+    """
+    try:
+        ranking_result = RankingResult.objects.select_related('job_description').get(
+            id=id,
+            user=request.user
+        )
+        
+        if ranking_result.status == 'completed':
+            return Response(
+                {'message': 'Ranking already completed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not ranking_result.cv_ids:
+            return Response(
+                {'message': 'Ranking cannot be resumed'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Only one resume at a time, and never while a worker or request is still on it
+        if not claim_ranking_for_resume(ranking_result):
+            return Response(
+                {'message': 'Ranking is already in progress'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        jd = ranking_result.job_description
+        
+        if wants_async(request):
+            try:
+                enqueue_ranking(ranking_result, ranking_result.cv_ids)
+            except RankingInProgress as e:
+                return Response({'message': str(e)}, status=status.HTTP_409_CONFLICT)
+            return queued_response(ranking_result, jd)
+        
+        try:
+            resume_ranking(ranking_result)
+        except Exception as e:
+            ranking_result.status = 'failed'
+            ranking_result.error = str(e)
+            ranking_result.save()
+            raise
+        
+        return Response({
+            'success': True,
+            'message': 'CVs ranked successfully',
+            'rankingResult': {
+                '_id': ranking_result.id,
+                'jdTitle': jd.title,
+                'results': ranking_result.results,
+                'createdAt': ranking_result.created_at.isoformat()
+            }
+        })
+    
+    except RankingResult.DoesNotExist:
+        return Response(
+            {'message': 'Ranking result not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error(f'Resume ranking error: {str(e)}')
+        return Response(
+            {'message': str(e) or 'Failed to resume ranking'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_ranking_result(request, id):
@@ -241,12 +450,15 @@ def rank_with_files(request):
     Rank CVs with direct file uploads.
     This endpoint handles the complete flow:
     1. Accept JD and CV file uploads
-    2. Parse PDFs on backend
-    3. Check credit limits
+    2. Reserve credits (rejected requests stop here, before any parsing)
+    3. Parse PDFs on backend
     4. Create JD, CV, and RankingResult records
-    5. Deduct credits
-    6. Rank CVs using ML model
+    5. Settle credits, releasing any reserved for CVs that weren't used
+    6. Rank CVs using ML model (or queue a background job with async=true)
     """
+    user = request.user
+    reserved = None
+    
     try:
         logger.info('📥 New ranking request with files')
         
@@ -254,58 +466,53 @@ def rank_with_files(request):
         jd_file = request.FILES.get('jd')
         cv_files = request.FILES.getlist('cvs')
         
+        # Files the upload handler refused while streaming never reach request.FILES
+        rejected = {r['field']: r for r in getattr(request, 'rejected_uploads', [])}
+        
         if not jd_file:
             return Response(
-                {'message': 'Please upload a JD file'},
+                {'message': f'JD file rejected: {rejected["jd"]["error"]}' if 'jd' in rejected else 'Please upload a JD file'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         if not cv_files or len(cv_files) == 0:
             return Response(
-                {'message': 'Please upload at least one CV file'},
+                {'message': f'CV file rejected: {rejected["cvs"]["error"]}' if 'cvs' in rejected else 'Please upload at least one CV file'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         logger.info(f'📄 JD file: {jd_file.name}')
         logger.info(f'📄 CV files count: {len(cv_files)}')
         
-        # Get user with plan
-        user = request.user
-        plan = user.plan
-        
-        # Check credits BEFORE processing
-        jd_limit = plan.jd_limit if plan else 0
-        cv_limit = plan.cv_limit if plan else 0
-        jd_used = user.jd_used or 0
-        cv_used = user.cv_used or 0
-        
-        # Handle unlimited plans (None or -1)
-        jd_remaining = float('inf') if (jd_limit is None or jd_limit == -1) else (jd_limit - jd_used)
-        cv_remaining = float('inf') if (cv_limit is None or cv_limit == -1) else (cv_limit - cv_used)
-        
-        logger.info(f'💳 Credits check - JD: {jd_used}/{jd_limit}, CV: {cv_used}/{cv_limit}')
-        
-        if jd_remaining < 1:
+        # Reserve credits BEFORE processing. The check and the deduction are one
+        # conditional UPDATE, so concurrent requests can't both pass and overspend.
+        if not reserve_credits(user, jd=1, cv=len(cv_files)):
+            remaining = get_remaining_credits(user)
+            logger.info(f'💳 Credits check failed - remaining JD: {remaining["jd"]}, CV: {remaining["cv"]}')
+            
+            if remaining['jd'] is not None and remaining['jd'] < 1:
+                return Response(
+                    {'message': 'Insufficient JD credits. Please upgrade your plan.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            
             return Response(
-                {'message': 'Insufficient JD credits. Please upgrade your plan.'},
+                {'message': f'Insufficient CV credits. You have {remaining["cv"]} remaining but selected {len(cv_files)} CVs.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if cv_remaining < len(cv_files):
-            return Response(
-                {'message': f'Insufficient CV credits. You have {int(cv_remaining)} remaining but selected {len(cv_files)} CVs.'},
-                status=status.HTTP_403_FORBIDDEN
-            )
+        reserved = {'jd': 1, 'cv': len(cv_files)}
         
         # Extract text from JD
         logger.info('📖 Extracting text from JD...')
         try:
             if jd_file.content_type == 'application/pdf':
-                jd_content = extract_text_from_pdf(jd_file.read())
+                jd_content = extract_text_from_pdf(pdf_source(jd_file))
             else:
                 jd_content = jd_file.read().decode('utf-8')
         except Exception as e:
             logger.error(f'Failed to extract JD text: {str(e)}')
+            release_credits(user, **reserved)
             return Response(
                 {'message': f'Failed to extract text from JD: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -324,6 +531,7 @@ def rank_with_files(request):
             status='active'
         )
         
+        adjust_active_count(user.id, 'jd', 1)
         logger.info(f'✅ JD created in DB: {jd.id}')
         
         # Extract text from CVs and create records
@@ -331,73 +539,71 @@ def rank_with_files(request):
         cv_records = []
         cv_data = []
         
-        for cv_file in cv_files:
-            try:
-                if cv_file.content_type == 'application/pdf':
-                    cv_content = extract_text_from_pdf(cv_file.read())
-                else:
-                    cv_content = cv_file.read().decode('utf-8')
-                
-                cv = CV.objects.create(
-                    user=user,
-                    filename=cv_file.name,
-                    content=cv_content,
-                    file_size=cv_file.size,
-                    status='active'
-                )
-                
-                cv_records.append(cv)
-                cv_data.append({
-                    'id': cv.id,
-                    'filename': cv.filename,
-                    'content': cv.content
-                })
-                
-                logger.info(f'✅ CV created in DB: {cv.id} - {cv.filename}')
-            except Exception as e:
-                logger.error(f'Failed to process CV {cv_file.name}: {str(e)}')
+        # PDFs are extracted in parallel; files already uploaded reuse their CV
+        duplicates = 0
+        timings = {}
+        for stored in store_uploaded_cvs(user, cv_files, timings=timings):
+            if stored['error']:
                 # Continue with other CVs
                 continue
+            
+            cv = stored['cv']
+            if stored['duplicate']:
+                duplicates += 1
+                # Same file twice in one upload: rank it once
+                if any(item['id'] == cv.id for item in cv_data):
+                    continue
+            
+            cv_records.append(cv)
+            cv_data.append({
+                'id': cv.id,
+                'filename': cv.filename,
+                'content': cv.content
+            })
+        
+        logger.info(f'✅ {len(cv_data)} CV(s) ready ({duplicates} already uploaded)')
+        logger.info(f'⏱️ CV upload timings ({len(cv_files)} files): {server_timing(timings)}')
         
         if not cv_data:
+            release_credits(user, **reserved)
             return Response(
                 {'message': 'Failed to process any CV files'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Deduct credits
-        user.jd_used = (user.jd_used or 0) + 1
-        user.cv_used = (user.cv_used or 0) + len(cv_data)
-        user.save()
+        # Settle credits: keep what was used, release the rest
+        release_credits(user, cv=reserved['cv'] - len(cv_data))
+        reserved = None
         
-        logger.info(f'💳 Credits deducted - New usage: JD {user.jd_used}/{jd_limit}, CV {user.cv_used}/{cv_limit}')
+        logger.info(f'💳 Credits deducted - New usage: JD {user.jd_used}, CV {user.cv_used}')
         
         # Create ranking result record
         ranking_result = RankingResult.objects.create(
             user=user,
             job_description=jd,
             status='processing',
-            results=[]
+            results=[],
+            cv_ids=[cv['id'] for cv in cv_data]
         )
         
+        if wants_async(request):
+            enqueue_ranking(ranking_result, ranking_result.cv_ids)
+            response = queued_response(ranking_result, jd)
+            response['Server-Timing'] = server_timing(timings)
+            return response
+        
         # Rank CVs using ML model
         try:
             logger.info('🤖 Calling ML API to rank CVs...')
-            rankings = rank_multiple_cvs(jd_content, cv_data)
+            started = time.perf_counter()
+            run_ranking(ranking_result, jd_content, cv_data)
+            timings['rank'] = (time.perf_counter() - started) * 1000
             logger.info('✅ ML API ranking completed successfully!')
             
-            # Update ranking result with results
-            ranking_result.results = rankings
-            ranking_result.status = 'completed'
-            ranking_result.save()
-            
-            # Update JD ranked CVs count
-            jd.ranked_cvs_count = len(cv_data)
-            jd.save()
-            
-            return Response({
+            response = Response({
                 'success': True,
                 'message': 'CVs ranked successfully',
+                'duplicates': duplicates,
                 'rankingResult': {
                     '_id': ranking_result.id,
                     'jdTitle': jd.title,
@@ -405,6 +611,8 @@ def rank_with_files(request):
                     'createdAt': ranking_result.created_at.isoformat()
                 }
             })
+            response['Server-Timing'] = server_timing(timings)
+            return response
         except Exception as e:
             # Update ranking result with error
             ranking_result.status = 'failed'
@@ -416,8 +624,111 @@ def rank_with_files(request):
     
     except Exception as e:
         logger.error(f'Ranking with files error: {str(e)}')
+        if reserved:
+            release_credits(user, **reserved)
         return Response(
             {'message': str(e) or 'Failed to rank CVs'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_top_cvs(request):
+    """
+    Get the highest-confidence CV results across all of the user's rankings.
+    Query params: limit (default 10, max 100), prediction (default 'Relevant', 'all' for any).
+    """
+    try:
+        limit = request.query_params.get('limit', '10')
+        limit = min(int(limit), 100) if limit.isdigit() else 10
+        prediction = request.query_params.get('prediction', 'Relevant')
+        
+        # Archived CVs are hidden here as in the CV lists
+        entries = RankingEntry.objects.filter(
+            ranking__user=request.user,
+            cv__status='active'
+        )
+        
+        if prediction != 'all':
+            entries = entries.filter(prediction=prediction)
+        
+        # values() so the CV and JD text columns are never read
+        entries = entries.order_by('-confidence', '-ranking_id').values(
+            'ranking_id', 'cv_id', 'cv__filename',
+            'ranking__job_description_id', 'ranking__job_description__title',
+            'prediction', 'confidence', 'created_at'
+        )[:limit]
+        
+        return Response({
+            'success': True,
+            'data': [
+                {
+                    'rankingId': entry['ranking_id'],
+                    'cv': {
+                        'id': entry['cv_id'],
+                        'filename': entry['cv__filename']
+                    },
+                    'jobDescription': {
+                        'id': entry['ranking__job_description_id'],
+                        'title': entry['ranking__job_description__title']
+                    },
+                    'prediction': entry['prediction'],
+                    'confidence': entry['confidence'],
+                    'createdAt': entry['created_at'].isoformat()
+                }
+                for entry in entries
+            ]
+        })
+    
+    except Exception as e:
+        logger.error(f'Get top CVs error: {str(e)}')
+        return Response(
+            {'message': 'Failed to fetch top CVs'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_cv_rankings(request, cv_id):
+    """
+    Get every ranking a CV appeared in, newest first.
+    """
+    try:
+        # Archived CVs are hidden as in get_top_cvs; values() keeps the
+        # ranking results JSON and the JD text out of the query
+        entries = list(RankingEntry.objects.filter(
+            cv_id=cv_id,
+            cv__status='active',
+            ranking__user=request.user
+        ).order_by('-ranking__created_at').values(
+            'ranking_id', 'ranking__job_description_id', 'ranking__job_description__title',
+            'prediction', 'confidence', 'error', 'ranking__created_at'
+        ))
+        
+        return Response({
+            'success': True,
+            'count': len(entries),
+            'data': [
+                {
+                    'rankingId': entry['ranking_id'],
+                    'jobDescription': {
+                        'id': entry['ranking__job_description_id'],
+                        'title': entry['ranking__job_description__title']
+                    },
+                    'prediction': entry['prediction'],
+                    'confidence': entry['confidence'],
+                    'error': entry['error'],
+                    'createdAt': entry['ranking__created_at'].isoformat()
+                }
+                for entry in entries
+            ]
+        })
+    
+    except Exception as e:
+        logger.error(f'Get CV rankings error: {str(e)}')
+        return Response(
+            {'message': 'Failed to fetch CV rankings'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
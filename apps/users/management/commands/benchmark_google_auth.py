@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from google.auth import crypt, jwt
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+import json
+import rsa
+import threading
+import time
+import uuid
+
+from services.google_auth_service import GoogleCertCache, verify_google_id_token
+
+AUDIENCE = 'benchmark-client-id.apps.googleusercontent.com'
+
+
+class StubCertsHandler(BaseHTTPRequestHandler):
+    """Stand-in for Google's cert endpoint: {key id: public key PEM} with a max-age."""
+
+    certs = {}
+    max_age = 3600
+    latency = 0.05
+    hits = 0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        StubCertsHandler.hits += 1
+        body = json.dumps(self.certs).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', f'public, max-age={self.max_age}, must-revalidate, no-transform')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Google ID-token verification (per-login cert fetch vs. cached certs) against a local key server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=200, help='Tokens verified per run')
+        parser.add_argument('--latency', type=float, default=0.05, help='Stub cert endpoint latency (seconds)')
+
+    def new_key(self):
+        public_key, private_key = rsa.newkeys(2048)
+        kid = uuid.uuid4().hex
+        StubCertsHandler.certs = {kid: public_key.save_pkcs1().decode('utf-8')}
+        return crypt.RSASigner(private_key, key_id=kid)
+
+    def mint(self, signer, count):
+        now = int(time.time())
+        return [
+            jwt.encode(signer, {
+                'iss': 'https://accounts.google.com',
+                'aud': AUDIENCE,
+                'sub': str(100000 + i),
+                'email': f'user{i}@example.com',
+                'iat': now,
+                'exp': now + 3600,
+            }).decode('utf-8')
+            for i in range(count)
+        ]
+
+    def run(self, label, verify, tokens):
+        hits = StubCertsHandler.hits
+        start = time.perf_counter()
+        for token in tokens:
+            verify(token)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{label:>24}: {elapsed / len(tokens) * 1000:7.2f} ms/login, '
+            f'{len(tokens) / elapsed:8.1f} logins/s, {StubCertsHandler.hits - hits} cert fetch(es)'
+        )
+
+    def handle(self, *args, **options):
+        StubCertsHandler.latency = options['latency']
+        signer = self.new_key()
+        tokens = self.mint(signer, options['logins'])
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubCertsHandler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/oauth2/v1/certs'
+
+        cert_cache = GoogleCertCache(url=url, min_refresh=0)
+        try:
+            self.stdout.write(f'{options["logins"]} logins, cert endpoint latency {options["latency"] * 1000:.0f} ms\n')
+
+            # What google_auth did before: a fresh transport and cert fetch per login
+            self.run(
+                'fetch per login',
+                lambda token: id_token.verify_token(token, google_requests.Request(), AUDIENCE, certs_url=url),
+                tokens
+            )
+            self.run('cached certs', lambda token: verify_google_id_token(token, AUDIENCE, cert_cache), tokens)
+
+            # Google rotates keys: a token with an unknown key id triggers one refetch
+            tokens = self.mint(self.new_key(), options['logins'])
+            self.run('cached, after rotation', lambda token: verify_google_id_token(token, AUDIENCE, cert_cache), tokens)
+        finally:
+            cert_cache.close()
+            server.shutdown()
+            server.server_close()
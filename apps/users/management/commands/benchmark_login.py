@@ -0,0 +1,92 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+import statistics
+import time
+import uuid
+
+from apps.users.models import User
+from services import password_service
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login throughput and latency through /api/auth/login with a throwaway user'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=64, help='Logins per concurrency level')
+        parser.add_argument('--concurrency', default='1,4,16,32', help='Comma-separated concurrent clients')
+        parser.add_argument('--rounds', type=int, default=None, help='bcrypt cost for the test user (default: current cost)')
+        parser.add_argument('--inline', action='store_true', help='Also run with bcrypt in the request thread, as before the hashing pool')
+
+    def show_costs(self):
+        self.stdout.write('bcrypt cost on this machine:')
+        for rounds in range(10, 14):
+            start = time.perf_counter()
+            bcrypt.hashpw(b'benchmark', bcrypt.gensalt(rounds=rounds))
+            self.stdout.write(f'  {rounds} rounds: {(time.perf_counter() - start) * 1000:7.1f} ms')
+        self.stdout.write(
+            f'  auto-calibrated for {password_service.PASSWORD_HASH_TARGET_MS} ms: '
+            f'{password_service.calibrate_rounds()} rounds\n'
+        )
+
+    def login_once(self, email, password):
+        start = time.perf_counter()
+        try:
+            response = Client().post(
+                '/api/auth/login',
+                {'email': email, 'password': password},
+                content_type='application/json'
+            )
+            return response.status_code, (time.perf_counter() - start) * 1000
+        finally:
+            connection.close()
+
+    def run_level(self, email, password, attempts, level):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            results = list(executor.map(lambda _: self.login_once(email, password), range(attempts)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(ms for code, ms in results if code == 200)
+        rejected = sum(1 for code, _ in results if code == 503)
+        failed = len(results) - len(latencies) - rejected
+        p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else (latencies or [0])[0]
+        return (
+            f'{level:>6} {len(latencies) / elapsed:9.1f}/s '
+            f'{statistics.median(latencies or [0]):9.1f} ms {p95:9.1f} ms {rejected:>6} {failed:>6}'
+        )
+
+    def handle(self, *args, **options):
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        rounds = options['rounds'] or password_service.get_rounds()
+        self.show_costs()
+
+        password = 'benchmark-password'
+        user = User.objects.create(
+            email=f'login-bench-{uuid.uuid4().hex[:12]}@example.com',
+            name='Login benchmark',
+            role='user',
+            password=bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+        )
+
+        modes = [('pool', password_service._run)]
+        if options['inline']:
+            modes.append(('inline', lambda func, *args: func(*args)))
+
+        original_run = password_service._run
+        try:
+            for name, run in modes:
+                password_service._run = run
+                self.stdout.write(
+                    f'{name}: {rounds} rounds, {password_service.PASSWORD_HASH_WORKERS} hashing thread(s), '
+                    f'max {password_service.PASSWORD_HASH_MAX_PENDING} pending'
+                )
+                self.stdout.write(f'{"conc.":>6} {"logins":>11} {"p50":>12} {"p95":>12} {"503":>6} {"failed":>6}')
+                for level in levels:
+                    self.stdout.write(self.run_level(user.email, password, options['attempts'], level))
+                self.stdout.write('')
+        finally:
+            password_service._run = original_run
+            user.delete()
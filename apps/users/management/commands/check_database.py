@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from io import StringIO
+
+from talentranker.db import SQLITE_TUNABLE_PRAGMAS
+
+# Our apps, leaves first, so unapplying them never breaks a dependency
+LOCAL_APPS = ['rankings', 'cvs', 'job_descriptions']
+
+
+class Command(BaseCommand):
+    help = (
+        'Show the active database profile and, with --migrations, check that every migration '
+        'applies, reverses and re-applies on a throwaway database. Run once per DB_ENGINE '
+        '(sqlite, postgres) to cover the migration matrix.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--migrations', action='store_true', help='Run the migration checks on a test database')
+
+    def describe(self):
+        db = settings.DATABASES['default']
+        self.stdout.write(f'Engine:       {db["ENGINE"]} ({connection.vendor})')
+        self.stdout.write(f'Name:         {db["NAME"]}')
+
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                for pragma in SQLITE_TUNABLE_PRAGMAS:
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.stdout.write(f'{pragma + ":":<14}{cursor.fetchone()[0]}')
+        else:
+            self.stdout.write(f'Host:         {db.get("HOST")}:{db.get("PORT")}')
+            self.stdout.write(f'Conn reuse:   CONN_MAX_AGE={db.get("CONN_MAX_AGE")}, health checks={db.get("CONN_HEALTH_CHECKS")}')
+            self.stdout.write(f'Pooler:       {"yes" if db.get("DISABLE_SERVER_SIDE_CURSORS") else "no"}')
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.stdout.write(self.style.SUCCESS('✅ Connection OK'))
+
+    def check_migrations(self):
+        out = StringIO()
+        try:
+            call_command('makemigrations', '--check', '--dry-run', stdout=out)
+        except SystemExit:
+            raise CommandError(f'Models have changes without migrations:\n{out.getvalue()}')
+        self.stdout.write(self.style.SUCCESS('✅ No missing migrations'))
+
+        old_name = connection.settings_dict['NAME']
+        # create_test_db applies every migration to a fresh database
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.stdout.write(self.style.SUCCESS('✅ Migrations apply on a fresh database'))
+
+            for app in LOCAL_APPS:
+                call_command('migrate', app, 'zero', verbosity=0)
+            self.stdout.write(self.style.SUCCESS(f'✅ Migrations reverse ({", ".join(LOCAL_APPS)})'))
+
+            call_command('migrate', verbosity=0)
+            self.stdout.write(self.style.SUCCESS('✅ Migrations re-apply'))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def handle(self, *args, **options):
+        self.describe()
+        if options['migrations']:
+            self.check_migrations()
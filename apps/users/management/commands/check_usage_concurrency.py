@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import uuid
+
+from apps.users.models import User
+from services.quota_service import record_usage
+
+
+class Command(BaseCommand):
+    help = 'Hammer usage accounting from parallel threads and verify no increments are lost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Parallel workers')
+        parser.add_argument('--requests', type=int, default=50, help='Requests per worker')
+        parser.add_argument('--cvs', type=int, default=3, help='CVs recorded per request')
+        parser.add_argument('--legacy', action='store_true', help='Also run the old read-modify-write save() for comparison')
+
+    def _run(self, user_id, threads, requests, work):
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def worker():
+            barrier.wait()
+            try:
+                for _ in range(requests):
+                    try:
+                        work(User.objects.get(id=user_id))
+                    except Exception as e:
+                        errors.append(str(e))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            for future in [executor.submit(worker) for _ in range(threads)]:
+                future.result()
+
+        return User.objects.get(id=user_id), errors
+
+    def _legacy(self, cvs):
+        def work(user):
+            user.jd_used += 1
+            user.cv_used += cvs
+            user.save()
+        return work
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        requests = options['requests']
+        cvs = options['cvs']
+        expected_jd = threads * requests
+        expected_cv = expected_jd * cvs
+
+        modes = [('atomic', lambda user: record_usage(user, jd=1, cv=cvs))]
+        if options['legacy']:
+            modes.append(('legacy', self._legacy(cvs)))
+
+        failed = False
+        for name, work in modes:
+            user = User.objects.create(
+                email=f'usage-check-{uuid.uuid4().hex[:12]}@example.com',
+                name='Usage check'
+            )
+            try:
+                user, errors = self._run(user.id, threads, requests, work)
+            finally:
+                User.objects.filter(id=user.id).delete()
+
+            lost_jd = expected_jd - user.jd_used - len(errors)
+            lost_cv = expected_cv - user.cv_used - len(errors) * cvs
+            line = (
+                f'{name:>7}: JD {user.jd_used}/{expected_jd}, CV {user.cv_used}/{expected_cv}, '
+                f'{len(errors)} failed request(s), {lost_jd} JD / {lost_cv} CV increment(s) lost'
+            )
+
+            if lost_jd or lost_cv:
+                self.stdout.write(self.style.WARNING(line))
+                if name == 'atomic':
+                    failed = True
+            else:
+                self.stdout.write(self.style.SUCCESS(line))
+
+            if errors:
+                self.stdout.write(f'         first error: {errors[0]}')
+
+        if failed:
+            raise CommandError('Atomic usage accounting lost increments')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from services.token_service import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = 'Delete expired refresh tokens (run periodically, e.g. daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per statement')
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Purged {deleted} expired refresh token(s)'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.models import User
+from services.quota_service import reconcile_usage, reset_active_counts, usage_cache_enabled
+
+
+class Command(BaseCommand):
+    help = 'Correct active JD/CV counts in the shared usage cache that drifted from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only check this user id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Users per round trip')
+        parser.add_argument('--reset', action='store_true', help='Drop the cached counts instead, forcing a recount on next use')
+
+    def handle(self, *args, **options):
+        if not usage_cache_enabled():
+            self.stdout.write(self.style.WARNING(
+                '⚠️ No shared usage cache (USAGE_CACHE_URL) is configured; limit checks count '
+                'in the database, so there is nothing to reconcile'
+            ))
+            return
+
+        if options['reset']:
+            user_ids = options['users'] or User.objects.values_list('id', flat=True).iterator()
+            reset = 0
+            for user_id in user_ids:
+                reset_active_counts(user_id)
+                reset += 1
+            self.stdout.write(self.style.SUCCESS(f'✅ Reset cached counts for {reset} user(s)'))
+            return
+
+        corrected = reconcile_usage(options['users'], batch_size=options['batch_size'])
+
+        for user_id, kind, cached, actual in corrected:
+            self.stdout.write(self.style.WARNING(f'🔄 User {user_id} {kind.upper()}: cached {cached}, actual {actual}'))
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Corrected {len(corrected)} cached count(s)'))
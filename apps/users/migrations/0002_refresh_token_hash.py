@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 19:02
+
+from django.db import migrations, models
+
+
+def delete_unhashed_tokens(apps, schema_editor):
+    # Rows stored the raw token and were never read; they can't be matched by hash
+    apps.get_model('users', 'RefreshToken').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_unhashed_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='refreshtoken',
+            name='token',
+        ),
+        migrations.AddField(
+            model_name='refreshtoken',
+            name='token_hash',
+            field=models.CharField(default='', max_length=64, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='refreshtoken',
+            name='revoked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='refreshtoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -1,7 +1,7 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 from django.utils import timezone
-import bcrypt
+from services.password_service import hash_password, verify_password, needs_rehash, PasswordHasherBusy
 
 
 class UserManager(BaseUserManager):
@@ -73,25 +73,41 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.email
     
     def set_password(self, raw_password):
-        """Hash password using bcrypt."""
+        """Hash password using bcrypt (on the shared hashing pool)."""
         if raw_password:
-            salt = bcrypt.gensalt(rounds=12)
-            self.password = bcrypt.hashpw(raw_password.encode('utf-8'), salt).decode('utf-8')
+            self.password = hash_password(raw_password)
     
     def check_password(self, raw_password):
-        """Check password using bcrypt."""
+        """
+        Check password using bcrypt (on the shared hashing pool).
+        Hashes made with a lower cost than the current one are upgraded on a successful check.
+        """
         if not self.password:
             return False
-        return bcrypt.checkpw(raw_password.encode('utf-8'), self.password.encode('utf-8'))
+        if not verify_password(raw_password, self.password):
+            return False
+        
+        if self.pk and needs_rehash(self.password):
+            try:
+                self.set_password(raw_password)
+                self.save(update_fields=['password'])
+            except PasswordHasherBusy:
+                pass  # Try again on a later login
+        return True
 
 
 class RefreshToken(models.Model):
-    """Model to store refresh tokens."""
+    """
+    Model to store issued refresh tokens.
+    Only a SHA-256 of the token is kept; rotated or logged-out tokens are marked
+    revoked and stay until they expire, so a replayed token can be recognised.
+    """
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='refresh_tokens')
-    token = models.CharField(max_length=500, unique=True)
+    token_hash = models.CharField(max_length=64, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    expires_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
     
     class Meta:
         db_table = 'refresh_tokens'
@@ -103,3 +119,7 @@ class RefreshToken(models.Model):
     @property
     def is_expired(self):
         return timezone.now() > self.expires_at
+    
+    @property
+    def is_revoked(self):
+        return self.revoked_at is not None
@@ -0,0 +1,15 @@
+"""
+User signals
+Keep the cached users behind JWT authentication in step with the users table
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import User
+from services.user_cache import invalidate_user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    """Drop the cached copy of a user that was edited or deleted."""
+    invalidate_user(instance.id)
@@ -0,0 +1,39 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from apps.job_descriptions.models import JobDescription
+from apps.plans.models import Plan
+from apps.users.models import User
+
+JD_KEYS = {
+    'id', 'title', 'description', 'filename', 'status',
+    'ranked_cvs_count', 'rankedCvsCount',
+    'created_at', 'createdAt', 'updated_at', 'updatedAt'
+}
+
+
+class UserJDsViewTests(TestCase):
+    """GET /api/users/jds response shape."""
+
+    def setUp(self):
+        plan = Plan.objects.create(name='Freemium', region='Global', jd_limit=5, cv_limit=50)
+        self.user = User.objects.create_user(email='user@example.com', password='secret1', name='User', plan=plan)
+        JobDescription.objects.create(user=self.user, title='Backend Engineer', content='Python, Django')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_shape_without_content(self):
+        response = self.client.get('/api/users/jds')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(set(body), {'success', 'total', 'nextCursor', 'hasMore', 'jds'})
+        self.assertEqual(body['total'], 1)
+        self.assertEqual(set(body['jds'][0]), JD_KEYS)
+
+    def test_include_content(self):
+        response = self.client.get('/api/users/jds', {'include': 'content'})
+
+        self.assertEqual(response.status_code, 200)
+        jd = response.json()['jds'][0]
+        self.assertEqual(set(jd), JD_KEYS | {'content'})
+        self.assertEqual(jd['content'], 'Python, Django')
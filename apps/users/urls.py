@@ -1,14 +1,15 @@
 from django.urls import path
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .serializers import UserSerializer
 from apps.job_descriptions.models import JobDescription
-from apps.job_descriptions.serializers import JobDescriptionSerializer
+from apps.job_descriptions.serializers import JobDescriptionSerializer, JobDescriptionSummarySerializer, JD_SUMMARY_FIELDS
 from apps.cvs.models import CV
 from apps.cvs.serializers import CVSerializer
-from apps.plans.models import Plan
-from apps.plans.serializers import PlanSerializer
+from services.pagination import paginate_keyset, count_first_page, requested_fields
+from services.plan_catalog_service import plan_catalog_response
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -39,11 +40,26 @@ def get_usage_stats(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_jds(request):
-    """Get all job descriptions for the current user."""
-    jds = JobDescription.objects.filter(user=request.user).order_by('-created_at')
-    serializer = JobDescriptionSerializer(jds, many=True)
+    """
+    Get job descriptions for the current user, one page at a time (limit, cursor).
+    JD text is only read and returned with include=content.
+    """
+    jds = JobDescription.objects.filter(user=request.user)
+    if 'content' in requested_fields(request):
+        serializer_class = JobDescriptionSerializer
+    else:
+        serializer_class = JobDescriptionSummarySerializer
+        jds = jds.only(*JD_SUMMARY_FIELDS)
+    try:
+        page, next_cursor = paginate_keyset(jds, request)
+    except ValueError as e:
+        return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = serializer_class(page, many=True)
     return Response({
         'success': True,
+        'total': count_first_page(jds, request),
+        'nextCursor': next_cursor,
+        'hasMore': next_cursor is not None,
         'jds': serializer.data
     })
 
@@ -61,13 +77,8 @@ def get_user_cvs(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_available_plans(request):
-    """Get all available plans."""
-    plans = Plan.objects.filter(is_active=True).order_by('sort_order')
-    serializer = PlanSerializer(plans, many=True)
-    return Response({
-        'success': True,
-        'plans': serializer.data
-    })
+    """Get all available plans (cached, supports If-None-Match)."""
+    return plan_catalog_response(request, 'available', private=True)
 
 urlpatterns = [
     path('me', get_current_user, name='get_current_user'),
@@ -0,0 +1,76 @@
+"""
+Upload Limits Middleware
+Rejects oversized or non-PDF uploads while the request body is still streaming,
+before any file is buffered in memory or spooled to disk
+"""
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.http import JsonResponse
+from services.pdf_service import PDF_MAGIC, PDF_MAX_UPLOAD_SIZE
+
+UPLOAD_MAX_REQUEST_SIZE = getattr(settings, 'UPLOAD_MAX_REQUEST_SIZE', 200 * 1024 * 1024)
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Refuse multipart requests whose Content-Length is over UPLOAD_MAX_REQUEST_SIZE
+    without reading the body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.content_type == 'multipart/form-data':
+            try:
+                content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                content_length = 0
+
+            if content_length > UPLOAD_MAX_REQUEST_SIZE:
+                limit_mb = UPLOAD_MAX_REQUEST_SIZE // (1024 * 1024)
+                return JsonResponse(
+                    {'message': f'Upload exceeds the {limit_mb}MB request limit'},
+                    status=413
+                )
+
+        return self.get_response(request)
+
+
+class PDFUploadGuardHandler(FileUploadHandler):
+    """
+    Upload handler that runs ahead of Django's memory/temp-file handlers.
+
+    Files declared as PDFs must start with the PDF magic bytes, and no file may
+    grow past PDF_MAX_UPLOAD_SIZE. Offending files are skipped as soon as the
+    first bad chunk arrives and recorded on request.rejected_uploads as
+    {'field', 'filename', 'error'} dicts so views can report them.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        if not hasattr(self.request, 'rejected_uploads'):
+            self.request.rejected_uploads = []
+
+    def _reject(self, error):
+        self.request.rejected_uploads.append({
+            'field': self.field_name,
+            'filename': self.file_name,
+            'error': error
+        })
+        raise SkipFile(error)
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and self.content_type == 'application/pdf' and not raw_data.startswith(PDF_MAGIC):
+            self._reject('File is not a valid PDF')
+
+        self.received += len(raw_data)
+        if self.received > PDF_MAX_UPLOAD_SIZE:
+            self._reject(f'File size exceeds {PDF_MAX_UPLOAD_SIZE // (1024 * 1024)}MB limit')
+
+        return raw_data
+
+    def file_complete(self, file_size):
+        # Let the next handler build the file object
+        return None
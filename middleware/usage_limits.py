@@ -4,8 +4,8 @@ Checks if users can upload JDs and CVs based on their plan limits
 """
 from rest_framework.response import Response
 from rest_framework import status
-from apps.job_descriptions.models import JobDescription
-from apps.cvs.models import CV
+from services.quota_service import get_usage_snapshot, record_usage
+from services.cv_service import count_new_uploads
 
 
 def check_jd_limit(view_func):
@@ -21,23 +21,22 @@ def check_jd_limit(view_func):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        if not user.plan:
+        # Plan limits and active counts come from the usage cache
+        snapshot = get_usage_snapshot(user, 'jd')
+        
+        if snapshot is None:
             return Response(
                 {'message': 'No active plan. Please subscribe to a plan to use this feature.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        jd_limit = user.plan.jd_limit
+        jd_limit = snapshot['limit']
         
         # -1 or None means unlimited
         if jd_limit == -1 or jd_limit is None:
             return view_func(request, *args, **kwargs)
         
-        # Count active JDs
-        active_jd_count = JobDescription.objects.filter(
-            user=user,
-            status='active'
-        ).count()
+        active_jd_count = snapshot['current']
         
         if active_jd_count >= jd_limit:
             return Response(
@@ -67,28 +66,32 @@ def check_cv_limit(view_func):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        if not user.plan:
+        # Plan limits and active counts come from the usage cache
+        snapshot = get_usage_snapshot(user, 'cv')
+        
+        if snapshot is None:
             return Response(
                 {'message': 'No active plan. Please subscribe to a plan to use this feature.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        cv_limit = user.plan.cv_limit
+        cv_limit = snapshot['limit']
         
         # -1 or None means unlimited
         if cv_limit == -1 or cv_limit is None:
             return view_func(request, *args, **kwargs)
         
-        # Count active CVs
-        active_cv_count = CV.objects.filter(
-            user=user,
-            status='active'
-        ).count()
+        active_cv_count = snapshot['current']
         
         # Check how many CVs are being uploaded
         files = request.FILES.getlist('cvFiles') or request.FILES.getlist('files')
         upload_count = len(files) if files else 1
         
+        # Re-uploads of CVs the user already has reuse those rows, so only
+        # new files count once the upload would go over the limit
+        if files and active_cv_count + upload_count > cv_limit:
+            upload_count = count_new_uploads(user, files)
+        
         if active_cv_count + upload_count > cv_limit:
             return Response(
                 {
@@ -105,19 +108,17 @@ def check_cv_limit(view_func):
     return wrapper
 
 
-def update_usage_stats(user, usage_type):
+def update_usage_stats(user, usage_type, count=1):
     """
     Update user usage statistics.
     
     Args:
         user: User instance
         usage_type (str): 'jd' or 'cv'
+        count (int): Number of items to add
     """
     try:
-        if usage_type == 'jd':
-            user.jd_used += 1
-        elif usage_type == 'cv':
-            user.cv_used += 1
-        user.save()
+        if usage_type in ('jd', 'cv'):
+            record_usage(user, **{usage_type: count})
     except Exception as e:
         print(f'Error updating usage stats: {str(e)}')
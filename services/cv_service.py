@@ -0,0 +1,170 @@
+"""
+CV Service
+Turns uploaded CV files into CV records, reusing rows for files the user already uploaded
+"""
+from django.db import connection, transaction
+from apps.cvs.models import CV
+from services.hashing import upload_digest, text_digest
+from services.pdf_service import extract_texts_from_pdfs, pdf_source
+from services.quota_service import adjust_active_count
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _existing_cvs(user, field, hashes):
+    """
+    Map hash -> CV for the user's CVs matching any of hashes.
+    Active rows win over archived ones.
+    """
+    if not hashes:
+        return {}
+
+    found = {}
+    cvs = CV.objects.filter(user=user, **{f'{field}__in': set(hashes)}).order_by('status', '-created_at')
+    for cv in cvs:
+        found.setdefault(getattr(cv, field), cv)
+    return found
+
+
+def count_new_uploads(user, files):
+    """
+    Number of files that would become new CVs: byte-identical copies of the
+    user's active CVs, and repeats within the upload, cost nothing. Files that
+    only match by extracted text aren't known until after parsing, so they
+    still count here.
+    """
+    file_hashes = {upload_digest(file) for file in files}
+    existing = CV.objects.filter(
+        user=user,
+        status='active',
+        file_hash__in=file_hashes
+    ).values_list('file_hash', flat=True)
+    return len(file_hashes - set(existing))
+
+
+def store_uploaded_cvs(user, files, timings=None):
+    """
+    Extract and save uploaded CV files, deduplicating by content hash.
+
+    A file whose bytes or extracted text match one of the user's active CVs
+    reuses that row instead of creating a new one. Files matching only an
+    archived CV reuse its extracted text and skip parsing.
+
+    Every file is extracted first; the new rows are then inserted with a
+    single bulk_create inside one transaction.
+
+    Args:
+        user: Owner of the CVs
+        files (list): Uploaded files (PDFs are parsed, anything else is read as UTF-8 text)
+        timings (dict): If given, filled with 'hash', 'extract' (including duplicate
+            lookups) and 'insert' durations in ms
+
+    Returns:
+        list: One dict per file, in upload order, with 'file', 'cv',
+            'duplicate' and 'error' keys
+    """
+    started = time.perf_counter()
+
+    # Hash in chunks; spooled uploads are never read into memory whole
+    file_hashes = [upload_digest(file) for file in files]
+    by_file = _existing_cvs(user, 'file_hash', file_hashes)
+
+    hashed = time.perf_counter()
+
+    # Only parse PDFs we haven't seen before
+    to_extract = [
+        i for i, file in enumerate(files)
+        if file_hashes[i] not in by_file and file.content_type == 'application/pdf'
+    ]
+    # The extraction cache is keyed by the same file hash, so pass it along
+    extracted = dict(zip(
+        to_extract,
+        extract_texts_from_pdfs(
+            [pdf_source(files[i]) for i in to_extract],
+            digests=[file_hashes[i] for i in to_extract]
+        )
+    ))
+
+    contents = []
+    for i, file in enumerate(files):
+        try:
+            if file_hashes[i] in by_file:
+                contents.append((by_file[file_hashes[i]].content, None))
+            elif i in extracted:
+                extraction = extracted[i]
+                contents.append((extraction['text'], extraction['error']))
+            else:
+                file.seek(0)
+                contents.append((file.read().decode('utf-8'), None))
+        except Exception as e:
+            contents.append((None, str(e)))
+
+    content_hashes = [text_digest(text) if text is not None else None for text, _ in contents]
+    by_content = _existing_cvs(user, 'content_hash', [h for h in content_hashes if h])
+
+    results = []
+    new_cvs = []
+    for i, file in enumerate(files):
+        text, error = contents[i]
+        if error:
+            logger.error(f'Failed to process CV {file.name}: {error}')
+            results.append({'file': file, 'cv': None, 'duplicate': False, 'error': error})
+            continue
+
+        existing = next(
+            (cv for cv in (by_file.get(file_hashes[i]), by_content.get(content_hashes[i]))
+             if cv is not None and cv.status == 'active'),
+            None
+        )
+        if existing:
+            logger.info(f'♻️ Duplicate CV {file.name} -> existing CV {existing.id or existing.filename}')
+            results.append({'file': file, 'cv': existing, 'duplicate': True, 'error': None})
+            continue
+
+        cv = CV(
+            user=user,
+            filename=file.name,
+            content=text,
+            file_size=file.size,
+            file_hash=file_hashes[i],
+            content_hash=content_hashes[i],
+            status='active'
+        )
+        new_cvs.append(cv)
+
+        # Later copies of the same file in this upload reuse the new row
+        by_file[file_hashes[i]] = cv
+        by_content[content_hashes[i]] = cv
+        results.append({'file': file, 'cv': cv, 'duplicate': False, 'error': None})
+
+    extracted_at = time.perf_counter()
+
+    # One INSERT (per batch) and one commit for the whole upload; ids are
+    # set on the objects in place, so results keep upload order. Backends that
+    # can't return ids from a bulk insert (SQLite before 3.35) insert row by
+    # row instead, still in one transaction, since callers need the ids.
+    if new_cvs:
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                CV.objects.bulk_create(new_cvs)
+            else:
+                for cv in new_cvs:
+                    cv.save(force_insert=True)
+        logger.info(f'💾 {len(new_cvs)} CV(s) saved to database: {[cv.id for cv in new_cvs]}')
+
+    adjust_active_count(user.id, 'cv', len(new_cvs))
+
+    finished = time.perf_counter()
+    if timings is not None:
+        timings['hash'] = (hashed - started) * 1000
+        timings['extract'] = (extracted_at - hashed) * 1000
+        timings['insert'] = (finished - extracted_at) * 1000
+
+    return results
+
+
+def server_timing(timings):
+    """Format a {name: ms} timings dict (see store_uploaded_cvs) as a Server-Timing header value."""
+    return ', '.join(f'{name};dur={duration:.1f}' for name, duration in timings.items())
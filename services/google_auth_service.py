@@ -0,0 +1,149 @@
+"""
+Google Auth Service
+Verifies Google ID tokens against a locally cached copy of Google's signing certs
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from google.auth import jwt
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Where the signing certs come from ({key id: PEM}); point at a stand-in key
+# server to test Google login without reaching Google
+GOOGLE_CERTS_URL = getattr(settings, 'GOOGLE_CERTS_URL', 'https://www.googleapis.com/oauth2/v1/certs')
+GOOGLE_CERTS_TIMEOUT = getattr(settings, 'GOOGLE_CERTS_TIMEOUT', 5)
+
+# Used when the response has no Cache-Control max-age
+GOOGLE_CERTS_DEFAULT_TTL = getattr(settings, 'GOOGLE_CERTS_DEFAULT_TTL', 300)
+
+# Least time between refetches forced by an unknown key id or a failed fetch,
+# so tokens with made-up key ids can't turn every login into a network call
+GOOGLE_CERTS_MIN_REFRESH = getattr(settings, 'GOOGLE_CERTS_MIN_REFRESH', 60)
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+class GoogleCertCache:
+    """
+    Google's signing certs, fetched over a keep-alive session and kept until the
+    Cache-Control max-age of the response runs out. Thread-safe; one instance
+    is shared by the whole process.
+    """
+
+    def __init__(self, url=None, timeout=None, default_ttl=None, min_refresh=None):
+        self.url = url or GOOGLE_CERTS_URL
+        self.timeout = timeout or GOOGLE_CERTS_TIMEOUT
+        self.default_ttl = default_ttl if default_ttl is not None else GOOGLE_CERTS_DEFAULT_TTL
+        self.min_refresh = min_refresh if min_refresh is not None else GOOGLE_CERTS_MIN_REFRESH
+
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=1))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=1))
+
+        self._lock = threading.Lock()
+        self._certs = None
+        self._expires = 0.0
+        self._fetched = 0.0
+        self.fetches = 0
+
+    def _ttl(self, response):
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        if not match:
+            return self.default_ttl
+        try:
+            age = int(response.headers.get('Age', 0))
+        except ValueError:
+            age = 0
+        return max(int(match.group(1)) - age, 0)
+
+    def _fetch(self):
+        response = self.session.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        certs = response.json()
+        ttl = self._ttl(response)
+
+        now = time.monotonic()
+        self._certs = certs
+        self._expires = now + ttl
+        self._fetched = now
+        self.fetches += 1
+        logger.info(f'🔑 Fetched {len(certs)} Google signing cert(s), valid for {ttl}s')
+
+    def get(self, kid=None):
+        """
+        Current certs. Refetches when they have expired, or when kid is given and
+        missing (Google rotated its keys) and the last fetch is old enough.
+
+        Raises:
+            requests.RequestException: If there are no certs yet and the fetch fails
+        """
+        certs, expires = self._certs, self._expires
+        if certs is not None and time.monotonic() < expires and (kid is None or kid in certs):
+            return certs
+
+        with self._lock:
+            now = time.monotonic()
+            stale = self._certs is None or now >= self._expires
+            unknown_kid = kid is not None and self._certs is not None and kid not in self._certs
+            if stale or (unknown_kid and now - self._fetched >= self.min_refresh):
+                try:
+                    self._fetch()
+                except (requests.RequestException, ValueError) as e:
+                    if self._certs is None:
+                        raise
+                    # Keep verifying with the old certs and retry after min_refresh
+                    logger.error(f'❌ Google cert refresh failed, using cached certs: {str(e)}')
+                    self._expires = now + self.min_refresh
+                    self._fetched = now
+            return self._certs
+
+    def close(self):
+        self.session.close()
+
+
+_cert_cache = None
+_cert_cache_lock = threading.Lock()
+
+
+def get_cert_cache():
+    """Return the process-wide cert cache, creating it on first use."""
+    global _cert_cache
+    if _cert_cache is None:
+        with _cert_cache_lock:
+            if _cert_cache is None:
+                _cert_cache = GoogleCertCache()
+    return _cert_cache
+
+
+def verify_google_id_token(token, audience, cert_cache=None):
+    """
+    Verify a Google ID token's signature, expiry, audience and issuer.
+    Only needs the network when the cached certs have expired.
+
+    Args:
+        token (str): Encoded ID token from the client
+        audience (str): Our OAuth client id
+        cert_cache (GoogleCertCache): Cache to use (defaults to the process-wide one)
+
+    Returns:
+        dict: The token's claims
+
+    Raises:
+        ValueError: If the token is invalid
+    """
+    cert_cache = cert_cache or get_cert_cache()
+    kid = jwt.decode_header(token).get('kid')
+
+    idinfo = jwt.decode(token, certs=cert_cache.get(kid), audience=audience)
+
+    if idinfo.get('iss') not in GOOGLE_ISSUERS:
+        raise ValueError('Wrong issuer.')
+
+    return idinfo
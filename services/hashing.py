@@ -0,0 +1,52 @@
+"""
+Hashing Helpers
+Content digests used for caching and deduplication
+"""
+import hashlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+def file_digest(source):
+    """
+    SHA-256 of raw file bytes.
+    source may be bytes, a file path, or an open/uploaded file; files are hashed
+    in chunks so they never have to be read into memory whole.
+    """
+    digest = hashlib.sha256()
+
+    if isinstance(source, bytes):
+        digest.update(source)
+    elif isinstance(source, str):
+        with open(source, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    elif hasattr(source, 'chunks'):
+        for chunk in source.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+        source.seek(0)
+    else:
+        source.seek(0)
+        for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+        source.seek(0)
+
+    return digest.hexdigest()
+
+
+def upload_digest(file):
+    """
+    file_digest of an uploaded file, computed once per file object, so the
+    limit check and the upload itself don't both hash the same bytes.
+    """
+    digest = getattr(file, '_upload_digest', None)
+    if digest is None:
+        digest = file_digest(file)
+        file._upload_digest = digest
+    return digest
+
+
+def text_digest(text):
+    """SHA-256 of text with whitespace collapsed, so re-extracted PDFs still match."""
+    normalized = ' '.join((text or '').split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
@@ -3,22 +3,139 @@ Machine Learning Service
 Handles communication with the ML API for CV ranking
 """
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.conf import settings
+from django.core.cache import caches
+from services.hashing import text_digest
+import hashlib
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 
 ML_API_URL = getattr(settings, 'ML_API_URL', 'https://ahmadmahmood447.pythonanywhere.com/api')
 ML_API_TIMEOUT = getattr(settings, 'ML_API_TIMEOUT', 30)
+ML_CONNECT_TIMEOUT = getattr(settings, 'ML_CONNECT_TIMEOUT', 5)
 
+# Max in-flight ML requests for a single batch, and across the whole process
+ML_MAX_CONCURRENCY = getattr(settings, 'ML_MAX_CONCURRENCY', 8)
+ML_PROCESS_MAX_CONCURRENCY = getattr(settings, 'ML_PROCESS_MAX_CONCURRENCY', 32)
 
-def rank_cv(jd_text, resume_text):
+# Keep-alive connections held open to the ML API host
+ML_POOL_SIZE = getattr(settings, 'ML_POOL_SIZE', ML_PROCESS_MAX_CONCURRENCY)
+
+# Prediction cache: bump ML_MODEL_VERSION whenever the model changes so old
+# predictions are never served, or disable the cache entirely
+ML_MODEL_VERSION = getattr(settings, 'ML_MODEL_VERSION', 'v1')
+ML_PREDICTION_CACHE_ENABLED = getattr(settings, 'ML_PREDICTION_CACHE_ENABLED', True)
+ML_PREDICTION_CACHE_ALIAS = getattr(settings, 'ML_PREDICTION_CACHE_ALIAS', 'ml_predictions')
+
+# Set when the prediction cache is shared by every worker (Redis). Clearing it
+# then bumps a generation number instead of calling clear(), which would flush
+# everything else stored on that Redis database.
+ML_PREDICTION_CACHE_SHARED = bool(getattr(settings, 'ML_PREDICTION_CACHE_URL', ''))
+ML_PREDICTION_GENERATION_KEY = 'ml:prediction:generation'
+
+# Shared by every batch running in this process so concurrent requests
+# can't multiply the load on the ML API
+_process_slots = threading.BoundedSemaphore(max(1, ML_PROCESS_MAX_CONCURRENCY))
+
+
+class MLClient:
+    """
+    Client for the ML API backed by a pooled keep-alive session.
+    Thread-safe, so one instance can be shared by every batch in the process.
+    """
+    
+    def __init__(self, url=None, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.url = url or ML_API_URL
+        self.pool_size = pool_size or ML_POOL_SIZE
+        self.timeout = (
+            connect_timeout or ML_CONNECT_TIMEOUT,
+            read_timeout or ML_API_TIMEOUT
+        )
+        
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
+        })
+    
+    def predict(self, jd_text, resume_text):
+        """POST one JD/resume pair and return the decoded JSON response."""
+        response = self.session.post(
+            self.url,
+            json={
+                'jd': jd_text,
+                'resume': resume_text
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def stats(self):
+        """
+        Connection pool statistics.
+        A miss is a request that had to open a new connection,
+        a hit is one that reused a kept-alive connection.
+        """
+        requests_made = 0
+        connections_opened = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_made += pool.num_requests
+            connections_opened += pool.num_connections
+        
+        return {
+            'requests': requests_made,
+            'hits': requests_made - connections_opened,
+            'misses': connections_opened,
+            'pool_size': self.pool_size
+        }
+    
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ml_client():
+    """Return the process-wide ML client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = MLClient()
+    return _client
+
+
+def get_ml_client_stats():
+    """Connection pool statistics for the process-wide ML client."""
+    return get_ml_client().stats()
+
+
+def rank_cv(jd_text, resume_text, client=None):
     """
     Rank a single CV against a JD using ML model.
     
     Args:
         jd_text (str): Job description text
         resume_text (str): Resume/CV text
+        client (MLClient): Client to use (defaults to the process-wide client)
     
     Returns:
         dict: Prediction result with 'prediction' and 'confidence' keys
@@ -31,18 +148,7 @@ def rank_cv(jd_text, resume_text):
         logger.info(f'📝 JD text length: {len(jd_text)} chars')
         logger.info(f'📄 Resume text length: {len(resume_text)} chars')
         
-        response = requests.post(
-            ML_API_URL,
-            json={
-                'jd': jd_text,
-                'resume': resume_text
-            },
-            headers={'Content-Type': 'application/json'},
-            timeout=ML_API_TIMEOUT
-        )
-        
-        response.raise_for_status()
-        data = response.json()
+        data = (client or get_ml_client()).predict(jd_text, resume_text)
         
         logger.info(f'✅ ML API Response: {data}')
         
@@ -71,46 +177,211 @@ def rank_cv(jd_text, resume_text):
         raise
 
 
-def rank_multiple_cvs(jd_text, cvs):
+def prediction_cache_key(jd_text, resume_text, jd_digest=None):
+    """Cache key for one (JD, CV, model version) prediction."""
+    jd_digest = jd_digest or text_digest(jd_text)
+    combined = f'{ML_MODEL_VERSION}:{jd_digest}:{text_digest(resume_text)}'
+    return 'ml:prediction:' + hashlib.sha256(combined.encode('utf-8')).hexdigest()
+
+
+_cache_stats = {'hits': 0, 'misses': 0}
+_cache_stats_lock = threading.Lock()
+
+
+def _prediction_cache():
+    return caches[ML_PREDICTION_CACHE_ALIAS]
+
+
+def _generation():
+    # Cache key version for predictions; always 1 for a per-process cache
+    if not ML_PREDICTION_CACHE_SHARED:
+        return 1
+    return _prediction_cache().get(ML_PREDICTION_GENERATION_KEY, 1)
+
+
+def _lookup_predictions(keys):
+    """Fetch cached predictions for keys in one round trip and record hits/misses."""
+    try:
+        found = _prediction_cache().get_many(keys, version=_generation())
+    except Exception as e:
+        logger.error(f'❌ Prediction cache lookup failed: {str(e)}')
+        found = {}
+    
+    with _cache_stats_lock:
+        _cache_stats['hits'] += len(found)
+        _cache_stats['misses'] += len(keys) - len(found)
+    return found
+
+
+def _store_prediction(key, prediction):
+    try:
+        _prediction_cache().set(key, prediction, version=_generation())
+    except Exception as e:
+        logger.error(f'❌ Prediction cache write failed: {str(e)}')
+
+
+def get_prediction_cache_stats():
+    """Prediction cache hit/miss counters for this process."""
+    with _cache_stats_lock:
+        hits = _cache_stats['hits']
+        misses = _cache_stats['misses']
+    lookups = hits + misses
+    return {
+        'enabled': ML_PREDICTION_CACHE_ENABLED,
+        'shared': ML_PREDICTION_CACHE_SHARED,
+        'modelVersion': ML_MODEL_VERSION,
+        'hits': hits,
+        'misses': misses,
+        'hitRatio': round(hits / lookups, 4) if lookups else 0.0
+    }
+
+
+def clear_prediction_cache():
+    """
+    Drop every cached prediction and reset this process's hit/miss counters.
+
+    A shared cache is cleared for every worker: the generation number moves on,
+    so old entries are never read again and expire on their own. A per-process
+    cache is only cleared in the process handling the call.
+
+    Returns:
+        bool: True if the clear reached every worker
+    """
+    if ML_PREDICTION_CACHE_SHARED:
+        cache = _prediction_cache()
+        cache.add(ML_PREDICTION_GENERATION_KEY, 1, None)
+        cache.incr(ML_PREDICTION_GENERATION_KEY)
+    else:
+        _prediction_cache().clear()
+    with _cache_stats_lock:
+        _cache_stats['hits'] = 0
+        _cache_stats['misses'] = 0
+    return ML_PREDICTION_CACHE_SHARED
+
+
+def _result_entry(cv, prediction):
+    return {
+        'cv': cv['id'],
+        'filename': cv['filename'],
+        'prediction': prediction['prediction'],
+        'confidence': prediction['confidence']
+    }
+
+
+def _score_cv(jd_text, cv, position, total, client=None, cache_key=None):
+    """
+    Score one CV and build its result entry.
+    Errors are captured in the entry instead of being raised.
+    """
+    logger.info(f'\n[{position}/{total}] Processing: {cv["filename"]}')
+    try:
+        with _process_slots:
+            prediction = rank_cv(jd_text, cv['content'], client=client)
+        logger.info(f'✅ Success: {cv["filename"]} - {prediction["prediction"]} ({prediction["confidence"]}%)')
+        if cache_key:
+            _store_prediction(cache_key, prediction)
+        return _result_entry(cv, prediction)
+    except Exception as e:
+        logger.error(f'❌ Error ranking CV {cv["filename"]}: {str(e)}')
+        return {
+            'cv': cv['id'],
+            'filename': cv['filename'],
+            'prediction': 'Error',
+            'confidence': 0,
+            'error': str(e)
+        }
+
+
+def iter_rank_results(jd_text, cvs, max_concurrency=None, client=None, use_cache=None):
+    """
+    Score CVs against a JD, yielding each result as soon as it is ready.
+    Cached predictions come first, then network results in completion order.
+    
+    Args:
+        jd_text (str): Job description text
+        cvs (list): List of CV dicts with 'id', 'filename', and 'content' keys
+        max_concurrency (int): Max in-flight ML requests for this batch
+            (defaults to ML_MAX_CONCURRENCY, 1 scores serially)
+        client (MLClient): Client to use (defaults to the process-wide client)
+        use_cache (bool): Consult the prediction cache
+            (defaults to ML_PREDICTION_CACHE_ENABLED)
+    
+    Yields:
+        tuple: (index into cvs, result entry)
+    """
+    total = len(cvs)
+    if max_concurrency is None:
+        max_concurrency = ML_MAX_CONCURRENCY
+    if use_cache is None:
+        use_cache = ML_PREDICTION_CACHE_ENABLED
+    
+    keys = [None] * total
+    pending = list(range(total))
+    
+    if use_cache and cvs:
+        jd_digest = text_digest(jd_text)
+        keys = [prediction_cache_key(jd_text, cv['content'], jd_digest) for cv in cvs]
+        cached = _lookup_predictions(keys)
+        pending = [i for i in range(total) if keys[i] not in cached]
+        for i, cv in enumerate(cvs):
+            if keys[i] in cached:
+                yield i, _result_entry(cv, cached[keys[i]])
+    
+    workers = max(1, min(max_concurrency, len(pending)))
+    logger.info(f'📊 Scoring {len(pending)} of {total} CVs ({workers} concurrent)')
+    
+    def score(i):
+        return _score_cv(jd_text, cvs[i], i + 1, total, client, keys[i])
+    
+    if workers == 1:
+        for i in pending:
+            yield i, score(i)
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ml-rank')
+    try:
+        futures = {executor.submit(score, i): i for i in pending}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # Don't keep scoring for a consumer that stopped listening
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def sort_results(results):
+    """
+    Sort by confidence (highest first), then by prediction (Relevant first).
+    Results must be in input order so ties match serial scoring exactly.
+    """
+    results.sort(key=lambda x: (x['prediction'] == 'Relevant', x['confidence']), reverse=True)
+    return results
+
+
+def rank_multiple_cvs(jd_text, cvs, max_concurrency=None, client=None, use_cache=None):
     """
     Rank multiple CVs against a JD.
     
     Args:
         jd_text (str): Job description text
         cvs (list): List of CV dicts with 'id', 'filename', and 'content' keys
+        max_concurrency (int): Max in-flight ML requests for this batch
+            (defaults to ML_MAX_CONCURRENCY, 1 scores serially)
+        client (MLClient): Client to use (defaults to the process-wide client)
+        use_cache (bool): Consult the prediction cache
+            (defaults to ML_PREDICTION_CACHE_ENABLED)
     
     Returns:
         list: Array of ranking results sorted by confidence
     """
-    results = []
-    
     logger.info('\n' + '=' * 60)
     logger.info(f'📊 Starting batch ranking: {len(cvs)} CVs')
     logger.info('=' * 60 + '\n')
     
-    for i, cv in enumerate(cvs):
-        logger.info(f'\n[{i + 1}/{len(cvs)}] Processing: {cv["filename"]}')
-        try:
-            prediction = rank_cv(jd_text, cv['content'])
-            results.append({
-                'cv': cv['id'],
-                'filename': cv['filename'],
-                'prediction': prediction['prediction'],
-                'confidence': prediction['confidence']
-            })
-            logger.info(f'✅ Success: {cv["filename"]} - {prediction["prediction"]} ({prediction["confidence"]}%)')
-        except Exception as e:
-            logger.error(f'❌ Error ranking CV {cv["filename"]}: {str(e)}')
-            results.append({
-                'cv': cv['id'],
-                'filename': cv['filename'],
-                'prediction': 'Error',
-                'confidence': 0,
-                'error': str(e)
-            })
-    
-    # Sort by confidence (highest first), then by prediction (Relevant first)
-    results.sort(key=lambda x: (x['prediction'] == 'Relevant', x['confidence']), reverse=True)
+    results = [None] * len(cvs)
+    for i, entry in iter_rank_results(jd_text, cvs, max_concurrency, client, use_cache):
+        results[i] = entry
+    
+    sort_results(results)
     
     logger.info('\n' + '=' * 60)
     logger.info('✅ Batch ranking completed!')
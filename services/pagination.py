@@ -0,0 +1,92 @@
+"""
+Pagination Service
+Keyset (cursor) pagination on (created_at, id), newest first
+"""
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+import base64
+import json
+
+LIST_PAGE_SIZE = getattr(settings, 'LIST_PAGE_SIZE', 50)
+LIST_MAX_PAGE_SIZE = getattr(settings, 'LIST_MAX_PAGE_SIZE', 200)
+
+
+def encode_cursor(obj):
+    """Opaque cursor pointing just past obj."""
+    raw = json.dumps([obj.created_at.isoformat(), obj.id])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor from encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, obj_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(obj_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def get_page_size(request):
+    """Page size from the 'limit' query param, clamped to LIST_MAX_PAGE_SIZE."""
+    limit = request.query_params.get('limit', '')
+    if not limit.isdigit() or int(limit) < 1:
+        return LIST_PAGE_SIZE
+    return min(int(limit), LIST_MAX_PAGE_SIZE)
+
+
+def requested_fields(request):
+    """Optional fields asked for via ?include=content or ?fields=content."""
+    values = ','.join([
+        request.query_params.get('include', ''),
+        request.query_params.get('fields', '')
+    ])
+    return {field.strip() for field in values.split(',') if field.strip()}
+
+
+def paginate_keyset(queryset, request):
+    """
+    Fetch one page of queryset, newest first, starting after the 'cursor' query param.
+    Each page is a single indexed range query, no OFFSET and no COUNT.
+
+    Returns:
+        tuple: (list of objects, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    page_size = get_page_size(request)
+    queryset = queryset.order_by('-created_at', '-id')
+
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        created_at, obj_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=obj_id)
+        )
+
+    # One extra row tells us whether there is a next page
+    items = list(queryset[:page_size + 1])
+    if len(items) > page_size:
+        items = items[:page_size]
+        return items, encode_cursor(items[-1])
+    return items, None
+
+
+def count_first_page(queryset, request):
+    """
+    Total row count, computed only for the first page.
+    Later pages (with a cursor) return None so a COUNT isn't re-run on every page;
+    clients keep the total from the first response.
+    """
+    if request.query_params.get('cursor'):
+        return None
+    return queryset.count()
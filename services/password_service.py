@@ -0,0 +1,144 @@
+"""
+Password Service
+bcrypt hashing and verification on a bounded thread pool, with admission
+control and a configurable (or auto-calibrated) cost
+"""
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+import bcrypt
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# bcrypt cost: an integer, or "auto" to pick the highest cost that hashes
+# within PASSWORD_HASH_TARGET_MS on this machine (never below the minimum)
+PASSWORD_HASH_ROUNDS = getattr(settings, 'PASSWORD_HASH_ROUNDS', 12)
+PASSWORD_HASH_MIN_ROUNDS = getattr(settings, 'PASSWORD_HASH_MIN_ROUNDS', 10)
+PASSWORD_HASH_TARGET_MS = getattr(settings, 'PASSWORD_HASH_TARGET_MS', 250)
+
+# bcrypt releases the GIL, so these threads hash in parallel up to the core count.
+# Beyond PASSWORD_HASH_MAX_PENDING queued + running jobs, callers wait up to
+# PASSWORD_HASH_WAIT seconds for a slot and are then turned away.
+PASSWORD_HASH_WORKERS = getattr(settings, 'PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+PASSWORD_HASH_MAX_PENDING = getattr(settings, 'PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4)
+PASSWORD_HASH_WAIT = getattr(settings, 'PASSWORD_HASH_WAIT', 2)
+
+# bcrypt's own bounds on the cost factor
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated and the caller should retry later."""
+
+
+_executor = None
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+_lock = threading.Lock()
+_rounds = None
+
+
+def _get_executor():
+    """Process-wide hashing pool, created on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                thread_name_prefix='bcrypt'
+            )
+        return _executor
+
+
+def calibrate_rounds(target_ms=None, min_rounds=None):
+    """
+    Highest bcrypt cost whose hash time stays within target_ms on this machine.
+    Each extra round doubles the work, so one timed hash at min_rounds is enough.
+
+    Returns:
+        int: Cost factor, at least min_rounds
+    """
+    target_ms = target_ms or PASSWORD_HASH_TARGET_MS
+    min_rounds = min_rounds or PASSWORD_HASH_MIN_ROUNDS
+
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds=min_rounds))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    rounds = min_rounds
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+def get_rounds():
+    """Cost used for new hashes (calibrated once per process when set to "auto")."""
+    global _rounds
+    if _rounds is None:
+        if str(PASSWORD_HASH_ROUNDS).lower() == 'auto':
+            rounds = calibrate_rounds()
+            logger.info(f'🔐 bcrypt cost calibrated to {rounds} rounds (target {PASSWORD_HASH_TARGET_MS} ms)')
+        else:
+            rounds = int(PASSWORD_HASH_ROUNDS)
+        _rounds = min(max(rounds, BCRYPT_MIN_ROUNDS), BCRYPT_MAX_ROUNDS)
+    return _rounds
+
+
+def _run(func, *args):
+    """Run func on the hashing pool, waiting for a slot if it is saturated."""
+    if not _slots.acquire(timeout=PASSWORD_HASH_WAIT):
+        logger.warning('⚠️ Password hashing pool saturated, rejecting request')
+        raise PasswordHasherBusy('Too many login attempts in progress. Please try again shortly.')
+
+    try:
+        future = _get_executor().submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future.result()
+
+
+def hash_password(raw_password):
+    """
+    Hash a password with bcrypt at the current cost.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
+    """
+    salt = bcrypt.gensalt(rounds=get_rounds())
+    return _run(bcrypt.hashpw, raw_password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(raw_password, hashed):
+    """
+    Check a password against a bcrypt hash.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated
+    """
+    if not hashed:
+        return False
+    try:
+        return _run(bcrypt.checkpw, raw_password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def hash_rounds(hashed):
+    """Cost factor stored in a bcrypt hash ($2b$<cost>$...), or None if unparseable."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    """True if a hash was made with a lower cost than the current one."""
+    rounds = hash_rounds(hashed)
+    return rounds is not None and rounds < get_rounds()
@@ -4,37 +4,161 @@ Handles PDF text extraction and validation
 """
 import PyPDF2
 from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.cache import caches
+from services.hashing import file_digest
+import logging
+import multiprocessing
+import os
+import signal
+import threading
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
-def extract_text_from_pdf(pdf_buffer):
+logger = logging.getLogger(__name__)
+
+# Budget for a single document; extraction stops early past these (0 for unlimited)
+PDF_MAX_PAGES = getattr(settings, 'PDF_MAX_PAGES', 100)
+PDF_MAX_CHARS = getattr(settings, 'PDF_MAX_CHARS', 200000)
+
+# Extracted text shared across users, keyed by the hash of the PDF bytes
+PDF_TEXT_CACHE_ENABLED = getattr(settings, 'PDF_TEXT_CACHE_ENABLED', True)
+PDF_TEXT_CACHE_ALIAS = getattr(settings, 'PDF_TEXT_CACHE_ALIAS', 'pdf_text')
+
+# Worker processes for batch extraction (0 or 1 extracts in the request thread)
+PDF_EXTRACT_WORKERS = getattr(settings, 'PDF_EXTRACT_WORKERS', os.cpu_count() or 1)
+PDF_EXTRACT_TIMEOUT = getattr(settings, 'PDF_EXTRACT_TIMEOUT', 30)
+PDF_EXTRACT_MEMORY_LIMIT_MB = getattr(settings, 'PDF_EXTRACT_MEMORY_LIMIT_MB', 512)
+
+# Upload checks, shared with the streaming upload handler
+PDF_MAX_UPLOAD_SIZE = getattr(settings, 'PDF_MAX_UPLOAD_SIZE', 10 * 1024 * 1024)
+PDF_MAGIC = b'%PDF-'
+
+
+def iter_pdf_pages(pdf_buffer, max_pages=None):
     """
-    Extract text content from PDF buffer.
+    Yield the text of each PDF page as it is parsed.
     
     Args:
-        pdf_buffer: File buffer or bytes object containing PDF data
+        pdf_buffer: File buffer, file path, or bytes object containing PDF data
+        max_pages (int): Stop after this many pages (None for all)
     
-    Returns:
-        str: Extracted text content
+    Yields:
+        tuple: (page index, page text)
+    """
+    if isinstance(pdf_buffer, str):
+        # PdfReader would read a path into memory; an open handle is read lazily
+        with open(pdf_buffer, 'rb') as fh:
+            yield from iter_pdf_pages(fh, max_pages)
+        return
     
-    Raises:
-        Exception: If PDF parsing fails
+    if isinstance(pdf_buffer, bytes):
+        pdf_buffer = BytesIO(pdf_buffer)
+    
+    pdf_reader = PyPDF2.PdfReader(pdf_buffer)
+    
+    for index, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and index >= max_pages:
+            break
+        yield index, page.extract_text() or ''
+
+
+def _parse_pdf(pdf_buffer, max_pages, max_chars):
+    """
+    Parse a PDF within the page/character budget.
+    
+    Returns:
+        tuple: (extracted text, pages parsed)
     """
     try:
-        if isinstance(pdf_buffer, bytes):
-            pdf_buffer = BytesIO(pdf_buffer)
+        parts = []
+        length = 0
         
-        pdf_reader = PyPDF2.PdfReader(pdf_buffer)
-        text = ''
+        for index, page_text in iter_pdf_pages(pdf_buffer, max_pages or None):
+            parts.append(page_text)
+            length += len(page_text)
+            if max_chars and length >= max_chars:
+                break
         
-        for page in pdf_reader.pages:
-            text += page.extract_text()
+        text = ''.join(parts)
+        if max_chars:
+            text = text[:max_chars]
         
-        return text.strip()
+        return text.strip(), len(parts)
     
     except Exception as e:
         raise Exception(f'Failed to extract text from PDF: {str(e)}')
 
 
+def _text_cache_key(pdf_buffer, max_pages, max_chars, digest=None):
+    # The budget changes the output, so it is part of the extractor version.
+    # Callers that already hashed the file pass its digest to skip a second read.
+    version = f'pypdf2-{PyPDF2.__version__}-p{max_pages}-c{max_chars}'
+    return f'pdf-text:{version}:{digest or file_digest(pdf_buffer)}'
+
+
+def _cached_texts(keys):
+    """Fetch cached extractions in one round trip; cache failures count as misses."""
+    if not PDF_TEXT_CACHE_ENABLED or not keys:
+        return {}
+    try:
+        return caches[PDF_TEXT_CACHE_ALIAS].get_many(keys)
+    except Exception as e:
+        logger.error(f'❌ PDF text cache lookup failed: {str(e)}')
+        return {}
+
+
+def _cache_texts(entries):
+    """Store {key: (text, pages)} in the extraction cache."""
+    if not PDF_TEXT_CACHE_ENABLED or not entries:
+        return
+    try:
+        caches[PDF_TEXT_CACHE_ALIAS].set_many({
+            key: {'text': text, 'pages': pages}
+            for key, (text, pages) in entries.items()
+        })
+    except Exception as e:
+        logger.error(f'❌ PDF text cache write failed: {str(e)}')
+
+
+def extract_text_from_pdf(pdf_buffer, max_pages=None, max_chars=None, digest=None):
+    """
+    Extract text content from PDF buffer.
+    Parsing stops early once the page or character budget is used up.
+    Results go through the shared extraction cache, keyed by file hash.
+    
+    Args:
+        pdf_buffer: File buffer, file path, or bytes object containing PDF data
+        max_pages (int): Page budget (defaults to PDF_MAX_PAGES, 0 for unlimited)
+        max_chars (int): Character budget (defaults to PDF_MAX_CHARS, 0 for unlimited)
+        digest (str): file_digest of the PDF, if the caller already has it
+    
+    Returns:
+        str: Extracted text content
+    
+    Raises:
+        Exception: If PDF parsing fails
+    """
+    if max_pages is None:
+        max_pages = PDF_MAX_PAGES
+    if max_chars is None:
+        max_chars = PDF_MAX_CHARS
+    
+    key = _text_cache_key(pdf_buffer, max_pages, max_chars, digest)
+    cached = _cached_texts([key])
+    if key in cached:
+        return cached[key]['text']
+    
+    text, pages = _parse_pdf(pdf_buffer, max_pages, max_chars)
+    _cache_texts({key: (text, pages)})
+    return text
+
+
 def validate_pdf(file):
     """
     Validate PDF file.
@@ -53,8 +177,165 @@ def validate_pdf(file):
         raise Exception('Only PDF files are allowed')
     
     # Check file size (max 10MB)
-    max_size = 10 * 1024 * 1024  # 10MB
-    if file.size > max_size:
-        raise Exception('File size exceeds 10MB limit')
+    if file.size > PDF_MAX_UPLOAD_SIZE:
+        raise Exception(f'File size exceeds {PDF_MAX_UPLOAD_SIZE // (1024 * 1024)}MB limit')
+    
+    # Check header magic so renamed non-PDFs never reach the parser
+    file.seek(0)
+    header = file.read(len(PDF_MAGIC))
+    file.seek(0)
+    if header != PDF_MAGIC:
+        raise Exception('File is not a valid PDF')
     
     return True
+
+
+def pdf_source(file):
+    """
+    Cheapest handle on an uploaded PDF for the extractor.
+    
+    Uploads spooled to disk are passed by path, so pool workers open the file
+    themselves instead of receiving a pickled copy of its bytes. Small uploads
+    kept in memory are passed as bytes.
+    
+    Args:
+        file: Uploaded file object
+    
+    Returns:
+        str or bytes: Temporary file path or file contents
+    """
+    if hasattr(file, 'temporary_file_path'):
+        return file.temporary_file_path()
+    file.seek(0)
+    return file.read()
+
+
+def _init_extract_worker(memory_limit_mb):
+    """Cap the address space of an extraction worker so a hostile PDF can't exhaust RAM."""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+
+
+def _raise_timeout(signum, frame):
+    raise TimeoutError('PDF extraction timed out')
+
+
+def _extract_worker(source, timeout, max_pages, max_chars):
+    """Extract one PDF inside a worker process, returning (text, pages, error)."""
+    use_alarm = hasattr(signal, 'setitimer') and timeout
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        text, pages = _parse_pdf(source, max_pages, max_chars)
+        return text, pages, None
+    except MemoryError:
+        return None, 0, 'Failed to extract text from PDF: file too large to process'
+    except Exception as e:
+        return None, 0, str(e)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """Process-wide extraction pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_extract_worker,
+                initargs=(PDF_EXTRACT_MEMORY_LIMIT_MB,)
+            )
+        return _pool
+
+
+def _reset_pool(broken):
+    """Drop a pool whose worker died so the next batch starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def extract_texts_from_pdfs(pdf_buffers, timeout=None, digests=None):
+    """
+    Extract text from many PDFs concurrently in a process pool.
+    Files already in the shared extraction cache skip parsing entirely.
+    
+    Args:
+        pdf_buffers (list): File paths or bytes objects containing PDF data
+            (see pdf_source)
+        timeout (float): Per-file time limit in seconds (defaults to PDF_EXTRACT_TIMEOUT)
+        digests (list): file_digest of each input, if the caller already has them
+    
+    Returns:
+        list: One dict per input, in input order, with 'text' and 'error' keys
+            (exactly one of them is None)
+    """
+    if timeout is None:
+        timeout = PDF_EXTRACT_TIMEOUT
+    max_pages = PDF_MAX_PAGES
+    max_chars = PDF_MAX_CHARS
+    
+    digests = digests or [None] * len(pdf_buffers)
+    keys = [
+        _text_cache_key(pdf_buffer, max_pages, max_chars, digest)
+        for pdf_buffer, digest in zip(pdf_buffers, digests)
+    ]
+    cached = _cached_texts(keys)
+    
+    results = [None] * len(pdf_buffers)
+    for i, key in enumerate(keys):
+        if key in cached:
+            results[i] = {'text': cached[key]['text'], 'error': None}
+    
+    pending = [i for i in range(len(pdf_buffers)) if results[i] is None]
+    extracted = {}
+    
+    if PDF_EXTRACT_WORKERS <= 1 or len(pending) <= 1:
+        for i in pending:
+            try:
+                extracted[i] = _parse_pdf(pdf_buffers[i], max_pages, max_chars) + (None,)
+            except Exception as e:
+                extracted[i] = (None, 0, str(e))
+    else:
+        pool = _get_pool()
+        futures = {
+            i: pool.submit(_extract_worker, pdf_buffers[i], timeout, max_pages, max_chars)
+            for i in pending
+        }
+        
+        broken = False
+        for i, future in futures.items():
+            try:
+                # Workers enforce the timeout themselves; this is a backstop for a stuck worker
+                extracted[i] = future.result(timeout=timeout + 5 if timeout else None)
+            except FutureTimeoutError:
+                extracted[i] = (None, 0, 'PDF extraction timed out')
+            except BrokenProcessPool:
+                extracted[i] = (None, 0, 'Failed to extract text from PDF: extraction worker crashed')
+                broken = True
+        
+        if broken:
+            _reset_pool(pool)
+    
+    to_cache = {}
+    for i, (text, pages, error) in extracted.items():
+        results[i] = {'text': text, 'error': error}
+        if error is None:
+            to_cache[keys[i]] = (text, pages)
+    _cache_texts(to_cache)
+    
+    return results
@@ -0,0 +1,114 @@
+"""
+Plan Catalog Service
+Pre-rendered, ETag-tagged JSON for the public plan listings
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework.renderers import JSONRenderer
+from apps.plans.models import Plan
+from apps.plans.serializers import PlanSerializer
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rendered catalogs live in the shared cache named by PLAN_CATALOG_CACHE_ALIAS
+# until a plan is saved or deleted (see the plans signals). Without one they
+# are kept per process for PLAN_CATALOG_LOCAL_TTL seconds only: a per-process
+# cache only hears about edits made in that process, so other workers would
+# keep serving old prices and ETags.
+PLAN_CATALOG_CACHE_ALIAS = getattr(settings, 'PLAN_CATALOG_CACHE_ALIAS', None)
+PLAN_CATALOG_TTL = getattr(settings, 'PLAN_CATALOG_TTL', 60 * 60)
+PLAN_CATALOG_LOCAL_TTL = getattr(settings, 'PLAN_CATALOG_LOCAL_TTL', 5)
+
+# How long clients and proxies may reuse a response before revalidating with If-None-Match
+PLAN_CATALOG_MAX_AGE = getattr(settings, 'PLAN_CATALOG_MAX_AGE', 60)
+
+# Catalog name -> ordering of the active plans it lists
+PLAN_CATALOGS = {
+    'all': ('region', 'sort_order', 'name'),
+    'available': ('sort_order',),
+}
+
+
+def _catalog_cache():
+    return caches[PLAN_CATALOG_CACHE_ALIAS or 'default']
+
+
+def _catalog_ttl():
+    return PLAN_CATALOG_TTL if PLAN_CATALOG_CACHE_ALIAS else PLAN_CATALOG_LOCAL_TTL
+
+
+def _catalog_key(name):
+    return f'plans:catalog:{name}'
+
+
+def _render_catalog(name):
+    plans = Plan.objects.filter(is_active=True).order_by(*PLAN_CATALOGS[name])
+    body = JSONRenderer().render({
+        'success': True,
+        'plans': PlanSerializer(plans, many=True).data
+    })
+    return {
+        'body': body,
+        'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    }
+
+
+def get_plan_catalog(name):
+    """
+    Rendered catalog, built on first use and then served from the cache
+    (for a few seconds only when the cache isn't shared).
+
+    Returns:
+        dict: 'body' (JSON bytes) and 'etag' (strong, quoted)
+    """
+    key = _catalog_key(name)
+    try:
+        catalog = _catalog_cache().get(key)
+    except Exception as e:
+        logger.error(f'❌ Plan catalog cache lookup failed: {str(e)}')
+        return _render_catalog(name)
+
+    if catalog is None:
+        catalog = _render_catalog(name)
+        try:
+            _catalog_cache().set(key, catalog, _catalog_ttl())
+        except Exception as e:
+            logger.error(f'❌ Plan catalog cache write failed: {str(e)}')
+
+    return catalog
+
+
+def invalidate_plan_catalog():
+    """Drop every rendered catalog after a plan changes."""
+    try:
+        _catalog_cache().delete_many([_catalog_key(name) for name in PLAN_CATALOGS])
+    except Exception as e:
+        logger.error(f'❌ Plan catalog cache delete failed: {str(e)}')
+
+
+def plan_catalog_response(request, name, private=False):
+    """
+    Response for a catalog endpoint: 304 when the client's If-None-Match
+    matches, otherwise the cached body. Both carry the ETag and Cache-Control.
+
+    Args:
+        request: Incoming request
+        name (str): Catalog name (a PLAN_CATALOGS key)
+        private (bool): Keep shared caches from storing it (authenticated endpoints)
+    """
+    catalog = get_plan_catalog(name)
+
+    response = get_conditional_response(request, etag=catalog['etag'])
+    if response is None:
+        response = HttpResponse(catalog['body'], content_type='application/json')
+
+    response['ETag'] = catalog['etag']
+    if private:
+        patch_cache_control(response, private=True, max_age=PLAN_CATALOG_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True, max_age=PLAN_CATALOG_MAX_AGE)
+    return response
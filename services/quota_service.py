@@ -0,0 +1,347 @@
+"""
+Quota Service
+Atomic JD/CV usage accounting and plan-limit snapshots
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, F
+from apps.users.models import User
+from apps.plans.models import Plan
+from apps.job_descriptions.models import JobDescription
+from apps.cvs.models import CV
+from services.user_cache import invalidate_user
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Active JD/CV counts and plan limits, read by the upload limit checks.
+# Only cached when USAGE_CACHE_ALIAS names a cache shared by every worker
+# (Redis, so incr is atomic); otherwise every check counts in the database.
+# A per-process cache would drift: each worker only sees its own adjustments.
+USAGE_CACHE_ALIAS = getattr(settings, 'USAGE_CACHE_ALIAS', None)
+USAGE_CACHE_TTL = getattr(settings, 'USAGE_CACHE_TTL', 60 * 60)
+
+USAGE_MODELS = {
+    'jd': JobDescription,
+    'cv': CV,
+}
+
+
+def _apply_usage(user, jd, cv, **conditions):
+    """
+    Add deltas to the usage counters in one UPDATE, optionally only when the
+    row matches conditions. Mirrors the change on the in-memory user.
+    """
+    updates = {}
+    if jd:
+        updates['jd_used'] = F('jd_used') + jd
+    if cv:
+        updates['cv_used'] = F('cv_used') + cv
+    if not updates:
+        return True
+
+    updated = User.objects.filter(id=user.id, **conditions).update(**updates)
+
+    if updated:
+        # update() skips post_save, so drop the cached user here
+        invalidate_user(user.id)
+        if jd:
+            user.jd_used = (user.jd_used or 0) + jd
+        if cv:
+            user.cv_used = (user.cv_used or 0) + cv
+
+    return bool(updated)
+
+
+def record_usage(user, jd=0, cv=0):
+    """
+    Add usage to a user's counters.
+
+    Applies all deltas for a request in a single UPDATE with F() expressions,
+    so the database does the increment and concurrent requests never lose
+    each other's counts. Only the counter columns are written.
+
+    The in-memory user gets the same deltas so the caller can report usage
+    without re-reading the row; the database stays authoritative.
+
+    Args:
+        user: User instance
+        jd (int): JDs to add
+        cv (int): CVs to add
+
+    Returns:
+        bool: True if the user row was updated
+    """
+    if not jd and not cv:
+        return False
+
+    updated = _apply_usage(user, jd, cv)
+    logger.info(f'💳 Usage recorded for user {user.id}: +{jd} JD, +{cv} CV')
+    return updated
+
+
+def _is_unlimited(limit):
+    return limit is None or limit == -1
+
+
+def reserve_credits(user, jd=0, cv=0):
+    """
+    Reserve JD/CV credits before doing any work for them.
+
+    The check and the deduction are one conditional UPDATE: the counters only
+    move if the user still has room under their plan limits, so concurrent
+    requests can't both pass the check and overspend. Reserved credits count
+    as used until released.
+
+    Args:
+        user: User instance
+        jd (int): JD credits to reserve
+        cv (int): CV credits to reserve
+
+    Returns:
+        bool: True if the credits were reserved
+    """
+    limits = get_plan_limits(user.plan_id) if user.plan_id else None
+    if limits is None:
+        limits = {'jd': 0, 'cv': 0}
+
+    conditions = {}
+    if jd and not _is_unlimited(limits['jd']):
+        conditions['jd_used__lte'] = limits['jd'] - jd
+    if cv and not _is_unlimited(limits['cv']):
+        conditions['cv_used__lte'] = limits['cv'] - cv
+
+    reserved = _apply_usage(user, jd, cv, **conditions)
+    if reserved:
+        logger.info(f'💳 Credits reserved for user {user.id}: {jd} JD, {cv} CV')
+    return reserved
+
+
+def release_credits(user, jd=0, cv=0):
+    """Give back reserved credits that ended up unused."""
+    if not jd and not cv:
+        return
+    _apply_usage(user, -jd, -cv)
+    logger.info(f'💳 Credits released for user {user.id}: {jd} JD, {cv} CV')
+
+
+def get_remaining_credits(user):
+    """
+    Credits left under the user's plan, read fresh from the database.
+
+    Returns:
+        dict: 'jd' and 'cv' remaining (None for unlimited)
+    """
+    user.refresh_from_db(fields=['jd_used', 'cv_used'])
+    limits = (get_plan_limits(user.plan_id) if user.plan_id else None) or {'jd': 0, 'cv': 0}
+    return {
+        'jd': None if _is_unlimited(limits['jd']) else max(limits['jd'] - user.jd_used, 0),
+        'cv': None if _is_unlimited(limits['cv']) else max(limits['cv'] - user.cv_used, 0)
+    }
+
+
+def usage_cache_enabled():
+    """True when a shared usage cache is configured."""
+    return bool(USAGE_CACHE_ALIAS)
+
+
+def _usage_cache():
+    return caches[USAGE_CACHE_ALIAS]
+
+
+def _count_key(user_id, kind):
+    return f'usage:{kind}:active:{user_id}'
+
+
+def _generation_key(user_id, kind):
+    return f'usage:{kind}:generation:{user_id}'
+
+
+def _plan_key(plan_id):
+    return f'usage:plan-limits:{plan_id}'
+
+
+def _count_active(user_id, kind):
+    return USAGE_MODELS[kind].objects.filter(user_id=user_id, status='active').count()
+
+
+def _load_plan_limits(plan_id):
+    row = Plan.objects.filter(id=plan_id).values('jd_limit', 'cv_limit').first()
+    if row is None:
+        return None
+    return {'jd': row['jd_limit'], 'cv': row['cv_limit']}
+
+
+def get_plan_limits(plan_id):
+    """
+    JD/CV limits for a plan. Cached until the plan is saved or deleted when a
+    shared usage cache is configured, otherwise read from the database.
+
+    Returns:
+        dict: 'jd' and 'cv' limits (-1 or None for unlimited), or None if the plan doesn't exist
+    """
+    if not usage_cache_enabled():
+        return _load_plan_limits(plan_id)
+
+    key = _plan_key(plan_id)
+    try:
+        limits = _usage_cache().get(key)
+    except Exception as e:
+        logger.error(f'❌ Usage cache lookup failed: {str(e)}')
+        return _load_plan_limits(plan_id)
+
+    if limits is None:
+        limits = _load_plan_limits(plan_id)
+        if limits is None:
+            return None
+        try:
+            _usage_cache().set(key, limits, USAGE_CACHE_TTL)
+        except Exception as e:
+            logger.error(f'❌ Usage cache write failed: {str(e)}')
+
+    return limits
+
+
+def invalidate_plan_limits(plan_id):
+    """Drop cached limits for a plan after it changes."""
+    if not usage_cache_enabled():
+        return
+    try:
+        _usage_cache().delete(_plan_key(plan_id))
+    except Exception as e:
+        logger.error(f'❌ Usage cache delete failed: {str(e)}')
+
+
+def get_active_count(user_id, kind):
+    """
+    Number of the user's active JDs ('jd') or CVs ('cv').
+
+    With a shared usage cache, a miss counts once and seeds the cache. An
+    adjustment that lands while the count runs bumps the generation key, and
+    the seed is then dropped, so a count taken before that change can't stick.
+    """
+    if not usage_cache_enabled():
+        return _count_active(user_id, kind)
+
+    key = _count_key(user_id, kind)
+    generation_key = _generation_key(user_id, kind)
+    try:
+        cache = _usage_cache()
+        count = cache.get(key)
+        if count is not None:
+            return count
+
+        generation = cache.get(generation_key)
+        count = _count_active(user_id, kind)
+        cache.add(key, count, USAGE_CACHE_TTL)
+        if cache.get(generation_key) != generation:
+            cache.delete(key)
+    except Exception as e:
+        logger.error(f'❌ Usage cache lookup failed: {str(e)}')
+        return _count_active(user_id, kind)
+
+    return count
+
+
+def adjust_active_count(user_id, kind, delta):
+    """
+    Apply a create (+n) or archive (-n) to the cached active count.
+    Call after the change is committed. If the count isn't cached the next
+    read recounts, so only the generation bump matters then.
+    """
+    if not delta or not usage_cache_enabled():
+        return
+    try:
+        cache = _usage_cache()
+        # Before incr, so a seed that counted before this change sees it moved
+        cache.set(_generation_key(user_id, kind), uuid.uuid4().hex, USAGE_CACHE_TTL)
+        cache.incr(_count_key(user_id, kind), delta)
+    except ValueError:
+        pass
+    except Exception as e:
+        logger.error(f'❌ Usage cache update failed: {str(e)}')
+        reset_active_counts(user_id)
+
+
+def reset_active_counts(user_id):
+    """Forget a user's cached active counts so the next check recounts."""
+    if not usage_cache_enabled():
+        return
+    try:
+        _usage_cache().delete_many([_count_key(user_id, kind) for kind in USAGE_MODELS])
+    except Exception as e:
+        logger.error(f'❌ Usage cache delete failed: {str(e)}')
+
+
+def get_usage_snapshot(user, kind):
+    """
+    Active count and plan limit for one kind of upload. Served without touching
+    the database when a shared usage cache holds both.
+
+    Returns:
+        dict: 'limit' and 'current' keys, or None if the user has no plan
+    """
+    if not user.plan_id:
+        return None
+    limits = get_plan_limits(user.plan_id)
+    if limits is None:
+        return None
+
+    limit = limits[kind]
+    if limit == -1 or limit is None:
+        return {'limit': limit, 'current': None}
+
+    return {'limit': limit, 'current': get_active_count(user.id, kind)}
+
+
+def reconcile_usage(user_ids=None, batch_size=500):
+    """
+    Compare cached active counts in the shared usage cache with the database
+    and fix any that drifted. Counts that aren't cached are left alone.
+
+    Args:
+        user_ids (list): Users to check (None for all)
+        batch_size (int): Users per cache/database round trip
+
+    Returns:
+        list: (user id, kind, cached count, actual count) for every corrected entry
+    """
+    if not usage_cache_enabled():
+        return []
+
+    users = User.objects.order_by('id').values_list('id', flat=True)
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+
+    cache = _usage_cache()
+    corrected = []
+    batch = []
+
+    def flush(ids):
+        cached = cache.get_many([_count_key(user_id, kind) for user_id in ids for kind in USAGE_MODELS])
+        if not cached:
+            return
+
+        for kind, model in USAGE_MODELS.items():
+            actual = dict(
+                model.objects.filter(user_id__in=ids, status='active')
+                .values('user_id').annotate(count=Count('id')).values_list('user_id', 'count')
+            )
+            for user_id in ids:
+                key = _count_key(user_id, kind)
+                if key in cached and cached[key] != actual.get(user_id, 0):
+                    corrected.append((user_id, kind, cached[key], actual.get(user_id, 0)))
+                    # Drop rather than overwrite, so an incr landing meanwhile isn't lost;
+                    # the next check recounts
+                    cache.delete(key)
+
+    for user_id in users.iterator(chunk_size=batch_size):
+        batch.append(user_id)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return corrected
@@ -0,0 +1,380 @@
+"""
+Ranking Service
+Runs ML ranking for a RankingResult and manages the background job queue
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from apps.rankings.models import RankingResult, RankingJob, RankingEntry
+from apps.job_descriptions.models import JobDescription
+from apps.cvs.models import CV
+from services.ml_service import iter_rank_results, sort_results
+import logging
+
+logger = logging.getLogger(__name__)
+
+RANKING_JOB_MAX_ATTEMPTS = getattr(settings, 'RANKING_JOB_MAX_ATTEMPTS', 3)
+RANKING_JOB_RETRY_DELAY = getattr(settings, 'RANKING_JOB_RETRY_DELAY', 30)
+RANKING_JOB_LOCK_TIMEOUT = getattr(settings, 'RANKING_JOB_LOCK_TIMEOUT', 30 * 60)
+
+
+class RankingJobLost(Exception):
+    """Raised when a worker finds its job lock was taken over by another worker."""
+
+
+def load_cv_data(user_id, cv_ids):
+    """
+    Load the CVs to rank for a user.
+
+    Returns:
+        list: CV dicts with 'id', 'filename', and 'content' keys
+    """
+    cvs = CV.objects.filter(
+        id__in=cv_ids,
+        user_id=user_id,
+        status='active'
+    )
+    return [
+        {
+            'id': cv.id,
+            'filename': cv.filename,
+            'content': cv.content
+        }
+        for cv in cvs
+    ]
+
+
+def save_ranking_entries(ranking_result, results):
+    """Replace the normalized RankingEntry rows for a ranking result."""
+    RankingEntry.objects.filter(ranking=ranking_result).delete()
+    RankingEntry.objects.bulk_create(
+        [RankingEntry.from_result(ranking_result, result) for result in results]
+    )
+
+
+def _renew_job_lock(job, **fields):
+    """
+    Refresh the job's lock, and apply any other field changes, only while this
+    worker still holds it. Every write a worker makes for a job goes through here.
+
+    Raises:
+        RankingJobLost: If another worker reclaimed the job
+    """
+    now = timezone.now()
+    fields.setdefault('locked_at', now)
+    renewed = RankingJob.objects.filter(
+        id=job.id,
+        status='running',
+        locked_by=job.locked_by
+    ).update(updated_at=now, **fields)
+    if not renewed:
+        raise RankingJobLost(f'Ranking job {job.id} is no longer locked by {job.locked_by}')
+
+    for field, value in fields.items():
+        setattr(job, field, value)
+
+
+def complete_ranking(ranking_result, rankings, cv_count, job=None):
+    """
+    Store final results on the ranking result, write its RankingEntry rows
+    and bump the JD ranked CVs count. With a job, it is marked completed in the
+    same transaction, and nothing is written if the worker lost its lock.
+    """
+    with transaction.atomic():
+        if job is not None:
+            _renew_job_lock(job, status='completed', last_error=None, locked_by=None, locked_at=None)
+
+        ranking_result.results = rankings
+        ranking_result.status = 'completed'
+        ranking_result.error = None
+        ranking_result.save()
+
+        save_ranking_entries(ranking_result, rankings)
+
+        # Update JD ranked CVs count
+        JobDescription.objects.filter(id=ranking_result.job_description_id).update(
+            ranked_cvs_count=F('ranked_cvs_count') + cv_count
+        )
+
+
+def checkpoint_ranking(ranking_result, results, job=None):
+    """
+    Persist partial results so a crash only loses the in-flight ML calls.
+    With a job, its lock is renewed first, so a long job isn't reclaimed while
+    it is still making progress.
+    """
+    with transaction.atomic():
+        if job is not None:
+            _renew_job_lock(job)
+
+        ranking_result.results = results
+        RankingResult.objects.filter(id=ranking_result.id).update(
+            results=results,
+            updated_at=timezone.now()
+        )
+
+
+def iter_ranking(ranking_result, jd_content, cv_data, job=None):
+    """
+    Rank CVs, yielding each result entry as soon as it is scored.
+
+    Results already stored on the ranking result (from an earlier, interrupted
+    run) are reused and yielded first; only missing or errored CVs are sent to
+    the ML API. Every new result is checkpointed, and the sorted results are
+    stored once every CV is done.
+
+    Pass the background job being run, if any, so checkpoints renew its lock
+    and stop with RankingJobLost once another worker has taken it over.
+    """
+    stored = {
+        entry['cv']: entry
+        for entry in (ranking_result.results or [])
+        if entry.get('prediction') != 'Error'
+    }
+
+    results = []
+    pending = []
+    for cv in cv_data:
+        if cv['id'] in stored:
+            results.append(stored[cv['id']])
+        else:
+            pending.append(cv)
+
+    if results:
+        logger.info(f'♻️ Reusing {len(results)} stored result(s), scoring {len(pending)}')
+
+    for entry in list(results):
+        yield entry
+
+    for _, entry in iter_rank_results(jd_content, pending):
+        results.append(entry)
+        checkpoint_ranking(ranking_result, results, job)
+        yield entry
+
+    # Back to input order before sorting so ties match serial scoring
+    position = {cv['id']: i for i, cv in enumerate(cv_data)}
+    results.sort(key=lambda entry: position[entry['cv']])
+    complete_ranking(ranking_result, sort_results(results), len(cv_data), job)
+
+
+def run_ranking(ranking_result, jd_content, cv_data, job=None):
+    """
+    Rank CVs and store the results on the ranking result.
+
+    Args:
+        ranking_result (RankingResult): Record to update
+        jd_content (str): Job description text
+        cv_data (list): CV dicts with 'id', 'filename', and 'content' keys
+        job (RankingJob): Background job being run, if any
+
+    Returns:
+        list: Array of ranking results sorted by confidence
+    """
+    for _ in iter_ranking(ranking_result, jd_content, cv_data, job):
+        pass
+    return ranking_result.results
+
+
+def resume_ranking(ranking_result):
+    """
+    Finish an interrupted ranking, re-scoring only the CVs without a stored result.
+
+    Returns:
+        list: Array of ranking results sorted by confidence
+    """
+    cv_data = load_cv_data(ranking_result.user_id, ranking_result.cv_ids)
+    if not cv_data:
+        raise Exception('No valid CVs found')
+
+    ranking_result.status = 'processing'
+    ranking_result.error = None
+    ranking_result.save()
+
+    return run_ranking(ranking_result, ranking_result.job_description.content, cv_data)
+
+
+class RankingInProgress(Exception):
+    """Raised when a ranking is already queued or being scored."""
+
+
+def _stale_before(now):
+    return now - timedelta(seconds=RANKING_JOB_LOCK_TIMEOUT)
+
+
+def _active_jobs(now):
+    # Queued, or running under a lock that hasn't expired
+    return RankingJob.objects.filter(
+        Q(status='queued') |
+        Q(status='running', locked_at__gte=_stale_before(now))
+    )
+
+
+def claim_ranking_for_resume(ranking_result):
+    """
+    Mark an interrupted ranking as processing again, unless something is still
+    working on it: an active background job, or a sync/streaming request that
+    has checkpointed within RANKING_JOB_LOCK_TIMEOUT.
+
+    The claim is a conditional UPDATE, so of two concurrent resumes only one wins.
+
+    Returns:
+        bool: True if the caller may resume the ranking
+    """
+    now = timezone.now()
+    if _active_jobs(now).filter(ranking_result_id=ranking_result.id).exists():
+        return False
+
+    claimed = RankingResult.objects.filter(id=ranking_result.id).filter(
+        Q(status='failed') |
+        Q(status='processing', updated_at__lt=_stale_before(now))
+    ).update(status='processing', error=None, updated_at=now)
+
+    if claimed:
+        ranking_result.status = 'processing'
+        ranking_result.error = None
+        ranking_result.updated_at = now
+    return bool(claimed)
+
+
+def enqueue_ranking(ranking_result, cv_ids):
+    """
+    Queue a ranking result to be scored by the background worker.
+    An existing finished, failed or stale job for the same ranking result is
+    reset and re-queued.
+
+    Raises:
+        RankingInProgress: If its job is still queued or running
+    """
+    now = timezone.now()
+    fields = {
+        'cv_ids': list(cv_ids),
+        'status': 'queued',
+        'attempts': 0,
+        'max_attempts': RANKING_JOB_MAX_ATTEMPTS,
+        'run_after': now,
+        'locked_by': None,
+        'locked_at': None,
+        'last_error': None
+    }
+
+    with transaction.atomic():
+        job = RankingJob.objects.filter(ranking_result=ranking_result).first()
+        if job is None:
+            job = RankingJob.objects.create(ranking_result=ranking_result, **fields)
+        else:
+            # Conditional, so a worker that claimed the job meanwhile keeps it
+            reset = RankingJob.objects.filter(id=job.id).exclude(
+                id__in=_active_jobs(now).values('id')
+            ).update(updated_at=now, **fields)
+            if not reset:
+                raise RankingInProgress('Ranking is already in progress')
+            job.refresh_from_db()
+
+    logger.info(f'📬 Ranking job queued: {job.id} ({len(job.cv_ids)} CVs)')
+    return job
+
+
+def _claimable_jobs(now):
+    # Running jobs renew their lock on every checkpoint, so one whose lock has
+    # expired belongs to a worker that died or stalled
+    return RankingJob.objects.filter(
+        Q(status='queued', run_after__lte=now) |
+        Q(status='running', locked_at__lt=_stale_before(now))
+    )
+
+
+def claim_next_job(worker_id):
+    """
+    Claim the next runnable job for this worker.
+    The claim is a conditional UPDATE, so concurrent workers never get the same job.
+
+    Returns:
+        RankingJob or None
+    """
+    now = timezone.now()
+    candidate_ids = list(
+        _claimable_jobs(now).order_by('run_after', 'id').values_list('id', flat=True)[:10]
+    )
+
+    for job_id in candidate_ids:
+        claimed = _claimable_jobs(now).filter(id=job_id).update(
+            status='running',
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            return RankingJob.objects.select_related(
+                'ranking_result', 'ranking_result__job_description'
+            ).get(id=job_id)
+
+    return None
+
+
+def _fail_job(job, error):
+    with transaction.atomic():
+        _renew_job_lock(job, status='failed', last_error=error, locked_by=None, locked_at=None)
+
+        RankingResult.objects.filter(id=job.ranking_result_id).update(
+            status='failed',
+            error=error,
+            updated_at=timezone.now()
+        )
+
+
+def process_job(job):
+    """
+    Run a claimed job, retrying with backoff until max_attempts is reached.
+    Every status change is conditional on this worker still holding the lock;
+    if another worker reclaimed the job, this one stops and leaves it alone.
+
+    Returns:
+        bool: True if the job completed
+    """
+    ranking_result = job.ranking_result
+
+    try:
+        return _process_job(job, ranking_result)
+    except RankingJobLost as e:
+        logger.warning(f'⚠️ {str(e)}, stopping')
+        return False
+
+
+def _process_job(job, ranking_result):
+    if job.attempts > job.max_attempts:
+        logger.error(f'❌ Ranking job {job.id} exceeded {job.max_attempts} attempts')
+        _fail_job(job, job.last_error or 'Ranking job exceeded maximum attempts')
+        return False
+
+    logger.info(f'🤖 Running ranking job {job.id} (attempt {job.attempts}/{job.max_attempts})')
+
+    try:
+        cv_data = load_cv_data(ranking_result.user_id, job.cv_ids)
+        if not cv_data:
+            raise Exception('No valid CVs found')
+
+        run_ranking(ranking_result, ranking_result.job_description.content, cv_data, job)
+
+        logger.info(f'✅ Ranking job {job.id} completed')
+        return True
+
+    except RankingJobLost:
+        raise
+    except Exception as e:
+        logger.error(f'❌ Ranking job {job.id} error: {str(e)}')
+
+        if job.attempts >= job.max_attempts:
+            _fail_job(job, str(e))
+            return False
+
+        _renew_job_lock(
+            job,
+            status='queued',
+            last_error=str(e),
+            locked_by=None,
+            locked_at=None,
+            run_after=timezone.now() + timedelta(seconds=RANKING_JOB_RETRY_DELAY * job.attempts)
+        )
+        return False
@@ -0,0 +1,199 @@
+"""
+Token Service
+Server-side refresh tokens: issue, rotate, revoke and purge
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken as JWTRefreshToken
+from apps.users.models import RefreshToken
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Hashes of tokens this process has seen revoked, kept until the token expires.
+# Repeated refreshes with a dead cookie are rejected without a query; anything
+# not in the set is checked against the refresh_tokens table.
+REFRESH_REVOCATION_CACHE_SIZE = getattr(settings, 'REFRESH_REVOCATION_CACHE_SIZE', 10000)
+
+# Seconds after a rotation during which the old token is only rejected, not
+# treated as stolen. Covers parallel tabs and client retries that send the same
+# cookie twice; reuse after this revokes every session of the user.
+REFRESH_REUSE_GRACE = getattr(settings, 'REFRESH_REUSE_GRACE', 5)
+
+_revoked = {}
+_revoked_lock = threading.Lock()
+
+
+class RefreshTokenInvalid(Exception):
+    """Raised when a refresh token is malformed, expired, revoked or unknown."""
+
+
+class RefreshTokenRecentlyRotated(RefreshTokenInvalid):
+    """
+    Raised when a token rotated less than REFRESH_REUSE_GRACE seconds ago is
+    presented again. Another request already got the new pair, so the client
+    should keep its cookie rather than drop it.
+    """
+
+
+def _token_hash(raw_token):
+    return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+
+def _expires_at(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+def _remember_revoked(token_hash, expires_at):
+    now = timezone.now()
+    with _revoked_lock:
+        if len(_revoked) >= REFRESH_REVOCATION_CACHE_SIZE:
+            for key in [key for key, exp in _revoked.items() if exp <= now]:
+                del _revoked[key]
+            if len(_revoked) >= REFRESH_REVOCATION_CACHE_SIZE:
+                # Still full: drop the oldest half (the table has the full record)
+                for key in list(_revoked)[:len(_revoked) // 2]:
+                    del _revoked[key]
+        _revoked[token_hash] = expires_at
+
+
+def _is_known_revoked(token_hash):
+    expires_at = _revoked.get(token_hash)
+    return expires_at is not None and expires_at > timezone.now()
+
+
+def issue_tokens(user):
+    """
+    Create a refresh/access token pair and record the refresh token.
+
+    Returns:
+        dict: 'refresh' and 'access' token strings
+    """
+    refresh = JWTRefreshToken.for_user(user)
+    raw = str(refresh)
+    RefreshToken.objects.create(
+        user=user,
+        token_hash=_token_hash(raw),
+        expires_at=_expires_at(refresh)
+    )
+    return {
+        'refresh': raw,
+        'access': str(refresh.access_token),
+    }
+
+
+def rotate_refresh_token(raw_token):
+    """
+    Exchange a refresh token for a new pair, revoking the old one.
+
+    The old row is claimed with a conditional UPDATE, so two concurrent refreshes
+    with the same token can't both succeed. Presenting a token that was already
+    rotated means it leaked (or was replayed), so every live token of that user
+    is revoked, unless it was rotated less than REFRESH_REUSE_GRACE seconds ago.
+
+    Returns:
+        tuple: (user, tokens dict)
+
+    Raises:
+        RefreshTokenRecentlyRotated: If the token was rotated within the grace window
+        RefreshTokenInvalid: If the token can't be used
+    """
+    try:
+        token = JWTRefreshToken(raw_token)
+    except TokenError as e:
+        raise RefreshTokenInvalid(str(e))
+
+    token_hash = _token_hash(raw_token)
+    if _is_known_revoked(token_hash):
+        raise RefreshTokenInvalid('Token has been revoked')
+
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = RefreshToken.objects.filter(
+            token_hash=token_hash,
+            revoked_at__isnull=True,
+            expires_at__gt=now
+        ).update(revoked_at=now)
+
+        if claimed:
+            row = RefreshToken.objects.select_related('user').get(token_hash=token_hash)
+            if not row.user.is_active:
+                raise RefreshTokenInvalid('User is inactive')
+            tokens = issue_tokens(row.user)
+
+    if not claimed:
+        row = RefreshToken.objects.filter(token_hash=token_hash).values('user_id', 'revoked_at').first()
+        if row and row['revoked_at']:
+            if row['revoked_at'] > now - timedelta(seconds=REFRESH_REUSE_GRACE):
+                # Just rotated by a concurrent request: reject this one only, and keep
+                # it out of the revocation set so later reuse still gets checked
+                logger.info(f'🔁 Refresh token reused within grace window for user {row["user_id"]}')
+                raise RefreshTokenRecentlyRotated('Token has already been rotated')
+            logger.warning(f'⚠️ Revoked refresh token reused for user {row["user_id"]}, revoking all sessions')
+            revoke_user_tokens(row['user_id'])
+        _remember_revoked(token_hash, _expires_at(token))
+        raise RefreshTokenInvalid('Token is revoked or unknown')
+
+    # The rotated token stays out of the revocation set, so a replay still reaches
+    # the table and triggers the reuse check above
+    return row.user, tokens
+
+
+def revoke_refresh_token(raw_token):
+    """Revoke one refresh token (logout). Unknown tokens are ignored."""
+    token_hash = _token_hash(raw_token)
+    now = timezone.now()
+    RefreshToken.objects.filter(token_hash=token_hash, revoked_at__isnull=True).update(revoked_at=now)
+
+    expires_at = RefreshToken.objects.filter(token_hash=token_hash).values_list('expires_at', flat=True).first()
+    if expires_at:
+        _remember_revoked(token_hash, expires_at)
+
+
+def revoke_user_tokens(user_id):
+    """
+    Revoke every live refresh token of a user.
+
+    Returns:
+        int: Number of tokens revoked
+    """
+    now = timezone.now()
+    live = RefreshToken.objects.filter(user_id=user_id, revoked_at__isnull=True, expires_at__gt=now)
+    rows = list(live.values_list('token_hash', 'expires_at'))
+    live.update(revoked_at=now)
+    for token_hash, expires_at in rows:
+        _remember_revoked(token_hash, expires_at)
+    return len(rows)
+
+
+def purge_expired_tokens(batch_size=1000):
+    """
+    Delete expired refresh tokens in batches, walking the expires_at index.
+    Revoked tokens are kept until they expire so reuse can still be detected.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(
+            RefreshToken.objects.filter(expires_at__lte=now)
+            .order_by('expires_at').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted += RefreshToken.objects.filter(id__in=ids).delete()[0]
+
+    with _revoked_lock:
+        for key in [key for key, exp in _revoked.items() if exp <= now]:
+            del _revoked[key]
+
+    if deleted:
+        logger.info(f'🧹 Purged {deleted} expired refresh token(s)')
+    return deleted
@@ -0,0 +1,101 @@
+"""
+User Cache
+Short-lived cache of the user (and their plan) behind each authenticated request
+"""
+from django.conf import settings
+from django.core.cache import caches
+from apps.users.models import User
+from apps.plans.models import Plan
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Users and plans are cached separately, so a plan edit is one delete rather than
+# one per subscriber. Entries are dropped on save/delete (see the users and plans
+# signals) and on usage updates; the TTL bounds anything that bypasses those,
+# such as bulk queryset updates.
+USER_CACHE_ALIAS = getattr(settings, 'USER_CACHE_ALIAS', 'default')
+USER_CACHE_TTL = getattr(settings, 'USER_CACHE_TTL', 60)
+
+
+def _user_cache():
+    return caches[USER_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _plan_key(plan_id):
+    return f'auth:plan:{plan_id}'
+
+
+def _cache_get(key):
+    try:
+        return _user_cache().get(key)
+    except Exception as e:
+        logger.error(f'❌ User cache lookup failed: {str(e)}')
+        return None
+
+
+def _cache_set(key, value):
+    try:
+        _user_cache().set(key, value, USER_CACHE_TTL)
+    except Exception as e:
+        logger.error(f'❌ User cache write failed: {str(e)}')
+
+
+def _cache_delete(key):
+    try:
+        _user_cache().delete(key)
+    except Exception as e:
+        logger.error(f'❌ User cache delete failed: {str(e)}')
+
+
+def get_cached_plan(plan_id):
+    """Plan by id, cached until the plan is saved or deleted. None if it doesn't exist."""
+    key = _plan_key(plan_id)
+    plan = _cache_get(key)
+    if plan is None:
+        plan = Plan.objects.filter(id=plan_id).first()
+        if plan is None:
+            return None
+        _cache_set(key, plan)
+    return plan
+
+
+def get_cached_user(user_id):
+    """
+    User by id with their plan attached, so neither the user lookup nor a later
+    user.plan access hits the database while the entry is cached.
+
+    The password hash is deferred and only loaded if something asks for it, which
+    also keeps it out of the cache. Saving a cached user writes only the loaded fields.
+
+    Returns:
+        User: The user, or None if no such user exists
+    """
+    key = _user_key(user_id)
+    user = _cache_get(key)
+    if user is None:
+        user = User.objects.filter(id=user_id).defer('password').first()
+        if user is None:
+            return None
+        # Cache the row without the plan; plans have their own entries
+        user._state.fields_cache.pop('plan', None)
+        _cache_set(key, user)
+
+    if user.plan_id:
+        # Assigning None (plan since deleted) also clears plan_id on this copy
+        user.plan = get_cached_plan(user.plan_id)
+    return user
+
+
+def invalidate_user(user_id):
+    """Drop a cached user after their row changes."""
+    _cache_delete(_user_key(user_id))
+
+
+def invalidate_plan(plan_id):
+    """Drop a cached plan after it changes."""
+    _cache_delete(_plan_key(plan_id))
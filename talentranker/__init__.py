@@ -0,0 +1,2 @@
+# Register database connection hooks before any connection is opened
+from . import db  # noqa: F401
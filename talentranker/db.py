@@ -0,0 +1,28 @@
+"""
+Database connection hooks
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# PRAGMAs we know how to apply; anything else in SQLITE_PRAGMAS is ignored
+SQLITE_TUNABLE_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Apply SQLITE_PRAGMAS to every new SQLite connection.
+    WAL lets readers keep reading while a ranking job or upload is writing,
+    and busy_timeout makes writers queue for the lock instead of failing.
+    """
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name in SQLITE_TUNABLE_PRAGMAS:
+            value = pragmas.get(name)
+            if value is None or value == '':
+                continue
+            cursor.execute(f'PRAGMA {name}={value}')
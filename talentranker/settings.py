@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "middleware.upload_limits.UploadSizeLimitMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -62,11 +63,55 @@ WSGI_APPLICATION = "talentranker.wsgi.application"
 
 AUTH_USER_MODEL = "users.User"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Database profile, picked by DB_ENGINE:
+#   sqlite   - single-box deployments (default); WAL + busy timeout so readers
+#              don't block on writers and writers wait instead of failing
+#   postgres - production; persistent connections re-checked before reuse,
+#              optionally behind a transaction-mode pooler such as PgBouncer
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DB_NAME", "talentranker"),
+            "USER": os.getenv("DB_USER", "talentranker"),
+            "PASSWORD": os.getenv("DB_PASSWORD", ""),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+                "application_name": "talentranker",
+            },
+        }
     }
+    # Transaction-mode poolers hand each transaction a different server
+    # connection, so cursors must not outlive a transaction
+    if os.getenv("DB_POOLER", "False") == "True":
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", str(BASE_DIR / "db.sqlite3")),
+            # Seconds a writer waits for the lock before "database is locked"
+            "OPTIONS": {"timeout": float(os.getenv("SQLITE_BUSY_TIMEOUT", "20"))},
+        }
+    }
+else:
+    raise ValueError(f"Unsupported DB_ENGINE: {DB_ENGINE}")
+
+# PRAGMAs applied to every new SQLite connection (see talentranker/db.py).
+# WAL lets readers run while a writer commits; synchronous=NORMAL is safe under
+# WAL and skips an fsync per commit; negative cache_size is in KiB.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(float(os.getenv("SQLITE_BUSY_TIMEOUT", "20")) * 1000),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024))),
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -74,6 +119,16 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator", "OPTIONS": {"min_length": 6}},
 ]
 
+# bcrypt runs on a bounded thread pool (services/password_service.py).
+# PASSWORD_HASH_ROUNDS may be "auto" to calibrate against PASSWORD_HASH_TARGET_MS;
+# stored hashes with a lower cost are upgraded on the next successful login.
+PASSWORD_HASH_ROUNDS = os.getenv("PASSWORD_HASH_ROUNDS", "12")
+PASSWORD_HASH_MIN_ROUNDS = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", "10"))
+PASSWORD_HASH_TARGET_MS = int(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 4)))
+PASSWORD_HASH_WAIT = int(os.getenv("PASSWORD_HASH_WAIT", "2"))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
@@ -88,7 +143,7 @@ MEDIA_ROOT = BASE_DIR / "uploads"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
-    "DEFAULT_AUTHENTICATION_CLASSES": ["rest_framework_simplejwt.authentication.JWTAuthentication"],
+    "DEFAULT_AUTHENTICATION_CLASSES": ["apps.authentication.authentication.CachedJWTAuthentication"],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_PARSER_CLASSES": [
         "rest_framework.parsers.JSONParser",
@@ -107,6 +162,14 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
 }
 
+# Refresh tokens are stored hashed in refresh_tokens and rotated on every refresh;
+# purge expired rows with `python manage.py purge_refresh_tokens`.
+# Revoked token hashes each process remembers to reject replays without a query:
+REFRESH_REVOCATION_CACHE_SIZE = int(os.getenv("REFRESH_REVOCATION_CACHE_SIZE", "10000"))
+# Seconds after a rotation in which reusing the old token is rejected without
+# revoking all of the user's sessions (parallel tabs, client retries):
+REFRESH_REUSE_GRACE = int(os.getenv("REFRESH_REUSE_GRACE", "5"))
+
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 CORS_ALLOWED_ORIGINS = [FRONTEND_URL]
 
@@ -121,8 +184,124 @@ CORS_ALLOW_CREDENTIALS = True
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET", "")
+# Signing certs for ID-token verification, cached per process for their Cache-Control max-age
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_TIMEOUT = int(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
+GOOGLE_CERTS_DEFAULT_TTL = int(os.getenv("GOOGLE_CERTS_DEFAULT_TTL", "300"))
+GOOGLE_CERTS_MIN_REFRESH = int(os.getenv("GOOGLE_CERTS_MIN_REFRESH", "60"))
+
+# Keyset-paginated list endpoints (?limit=&cursor=)
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "50"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "200"))
 
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760
+# ML API
+ML_API_URL = os.getenv("ML_API_URL", "https://ahmadmahmood447.pythonanywhere.com/api")
+ML_API_TIMEOUT = int(os.getenv("ML_API_TIMEOUT", "30"))
+ML_CONNECT_TIMEOUT = int(os.getenv("ML_CONNECT_TIMEOUT", "5"))
+ML_MAX_CONCURRENCY = int(os.getenv("ML_MAX_CONCURRENCY", "8"))
+ML_PROCESS_MAX_CONCURRENCY = int(os.getenv("ML_PROCESS_MAX_CONCURRENCY", "32"))
+ML_POOL_SIZE = int(os.getenv("ML_POOL_SIZE", "32"))
+
+# Bump ML_MODEL_VERSION when the model changes to invalidate cached predictions
+ML_MODEL_VERSION = os.getenv("ML_MODEL_VERSION", "v1")
+ML_PREDICTION_CACHE_ENABLED = os.getenv("ML_PREDICTION_CACHE_ENABLED", "True") == "True"
+ML_PREDICTION_CACHE_ALIAS = "ml_predictions"
+# Redis URL to share cached predictions (and the admin "clear") across workers;
+# without it each worker process keeps its own LRU cache (below)
+ML_PREDICTION_CACHE_URL = os.getenv("ML_PREDICTION_CACHE_URL", "")
+
+# Background ranking jobs (drained by `python manage.py run_ranking_worker`)
+RANKING_ASYNC_DEFAULT = os.getenv("RANKING_ASYNC_DEFAULT", "False") == "True"
+RANKING_JOB_MAX_ATTEMPTS = int(os.getenv("RANKING_JOB_MAX_ATTEMPTS", "3"))
+RANKING_JOB_RETRY_DELAY = int(os.getenv("RANKING_JOB_RETRY_DELAY", "30"))
+RANKING_JOB_LOCK_TIMEOUT = int(os.getenv("RANKING_JOB_LOCK_TIMEOUT", str(30 * 60)))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # LRU with TTL: least recently used entries are culled past MAX_ENTRIES
+    "ml_predictions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "ml-predictions",
+        "TIMEOUT": int(os.getenv("ML_PREDICTION_CACHE_TTL", str(7 * 24 * 60 * 60))),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("ML_PREDICTION_CACHE_MAX_ENTRIES", "10000"))},
+    },
+    # Extracted PDF text on disk, shared by every worker process on the box.
+    # Culls a third of the entries once MAX_ENTRIES is reached.
+    "pdf_text": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("PDF_TEXT_CACHE_DIR", str(BASE_DIR / "cache" / "pdf_text")),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("PDF_TEXT_CACHE_MAX_ENTRIES", "5000"))},
+    },
+    # Users and plans behind JWT authentication, so API calls skip those two queries.
+    # Per-process here; point it at a shared cache when running several workers.
+    "users": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "users",
+        "TIMEOUT": int(os.getenv("USER_CACHE_TTL", "60")),
+    },
+}
+
+if ML_PREDICTION_CACHE_URL:
+    CACHES["ml_predictions"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": ML_PREDICTION_CACHE_URL,
+        "TIMEOUT": CACHES["ml_predictions"]["TIMEOUT"],
+    }
+
+# Per-user active JD/CV counts and plan limits for the upload limit checks.
+# Only cached in a cache every worker shares (Redis, e.g. redis://localhost:6379/1);
+# without one the checks count in the database, which is exact with any number of workers.
+USAGE_CACHE_URL = os.getenv("USAGE_CACHE_URL", "")
+USAGE_CACHE_TTL = int(os.getenv("USAGE_CACHE_TTL", str(60 * 60)))
+if USAGE_CACHE_URL:
+    CACHES["usage"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": USAGE_CACHE_URL,
+        "TIMEOUT": USAGE_CACHE_TTL,
+    }
+USAGE_CACHE_ALIAS = "usage" if USAGE_CACHE_URL else None
+USER_CACHE_ALIAS = "users"
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+
+# Rendered plan listings (/api/plans/, /api/users/plans), dropped whenever a plan changes.
+# Held for PLAN_CATALOG_TTL in a cache every worker shares (Redis) when
+# PLAN_CATALOG_CACHE_URL is set; otherwise each process keeps its own copy for
+# only PLAN_CATALOG_LOCAL_TTL seconds, since an edit only clears the worker that made it.
+# Clients may reuse a response for PLAN_CATALOG_MAX_AGE seconds, then revalidate by ETag.
+PLAN_CATALOG_CACHE_URL = os.getenv("PLAN_CATALOG_CACHE_URL", "")
+PLAN_CATALOG_TTL = int(os.getenv("PLAN_CATALOG_TTL", str(60 * 60)))
+PLAN_CATALOG_LOCAL_TTL = int(os.getenv("PLAN_CATALOG_LOCAL_TTL", "5"))
+if PLAN_CATALOG_CACHE_URL:
+    CACHES["plan_catalog"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": PLAN_CATALOG_CACHE_URL,
+        "TIMEOUT": PLAN_CATALOG_TTL,
+    }
+PLAN_CATALOG_CACHE_ALIAS = "plan_catalog" if PLAN_CATALOG_CACHE_URL else None
+PLAN_CATALOG_MAX_AGE = int(os.getenv("PLAN_CATALOG_MAX_AGE", "60"))
+
+# PDF extraction budget per document (0 for unlimited) and process pool
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "100"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "200000"))
+PDF_TEXT_CACHE_ENABLED = os.getenv("PDF_TEXT_CACHE_ENABLED", "True") == "True"
+PDF_TEXT_CACHE_ALIAS = "pdf_text"
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_EXTRACT_TIMEOUT = int(os.getenv("PDF_EXTRACT_TIMEOUT", "30"))
+PDF_EXTRACT_MEMORY_LIMIT_MB = int(os.getenv("PDF_EXTRACT_MEMORY_LIMIT_MB", "512"))
+
+# Uploads: files over FILE_UPLOAD_MAX_MEMORY_SIZE spool to temp files instead of RAM,
+# and the guard handler rejects bad files while the body is still streaming
+PDF_MAX_UPLOAD_SIZE = int(os.getenv("PDF_MAX_UPLOAD_SIZE", str(10 * 1024 * 1024)))
+UPLOAD_MAX_REQUEST_SIZE = int(os.getenv("UPLOAD_MAX_REQUEST_SIZE", str(200 * 1024 * 1024)))
+FILE_UPLOAD_HANDLERS = [
+    "middleware.upload_limits.PDFUploadGuardHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(512 * 1024)))
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760
 
-print(" Django settings loaded (SQLite)")
+print(f" Django settings loaded ({DATABASES['default']['ENGINE'].split('.')[-1]})")
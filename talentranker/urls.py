@@ -3,6 +3,7 @@ URL configuration for TalentRanker project.
 """
 from django.contrib import admin
 from django.urls import path, include
+from django.db import connection
 from django.http import JsonResponse
 from django.utils import timezone
 
@@ -11,7 +12,8 @@ def health_check(request):
     """Health check endpoint."""
     return JsonResponse({
         'status': 'ok',
-        'timestamp': timezone.now().isoformat()
+        'timestamp': timezone.now().isoformat(),
+        'database': connection.vendor
     })
 
 